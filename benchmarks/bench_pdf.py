@@ -0,0 +1,218 @@
+# /// script
+# requires-python = ">=3.13"
+# dependencies = [
+#     "pymupdf",
+#     "pymupdf4llm",
+# ]
+# ///
+"""pdf_to_markdown 轉換效能基準測試
+
+以 PyMuPDF 在本機產生合成 PDF（文字為主、表格為主、圖片為主，頁數可調），
+對每種轉換選項組合（table_strategy、use_toc、write_images、dpi）執行
+`pdf_to_markdown`，輸出每秒頁數、各階段耗時（open / headers / convert / write）
+與記憶體峰值（RSS）。每個案例在獨立的子行程中執行，記憶體峰值互不影響；
+可選擇輸出 cProfile 結果供 `python -m pstats` 或 snakeviz 分析。
+
+執行方式：
+    uv run benchmarks/bench_pdf.py [--pages 20,100] [--kinds text,table,image]
+        [--strategies lines_strict,lines,none] [--dpi 72,150] [--profile-dir prof]
+        [--csv results.csv]
+
+輸出 CSV 後可與先前的結果比對，檢查轉換速度是否退步。
+"""
+
+import argparse
+import cProfile
+import csv
+import itertools
+import multiprocessing
+import pathlib
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+BENCH_DIR = pathlib.Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+import pymupdf  # noqa: E402
+
+import pdf_to_markdown  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows 沒有 resource 模組，記憶體峰值改顯示為 -
+    resource = None
+
+# 合成文件使用的詞彙
+WORDS = ["credit", "account", "review", "approval", "limit", "branch", "report", "customer", "loan", "rate"]
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def build_text_pdf(path: pathlib.Path, pages: int, seed: int = 0) -> None:
+    """產生文字為主的 PDF：每頁一個標題與多段內文，並建立對應的 TOC"""
+    rng = random.Random(seed)
+    doc = pymupdf.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Section {i + 1}", fontsize=18)
+        text = "\n\n".join(_paragraph(rng, rng.randint(40, 80)) for _ in range(5))
+        page.insert_textbox(pymupdf.Rect(72, 100, 540, 760), text, fontsize=10)
+    doc.set_toc([[1, f"Section {i + 1}", i + 1] for i in range(pages)])
+    doc.save(path)
+    doc.close()
+
+
+def build_table_pdf(path: pathlib.Path, pages: int, seed: int = 0) -> None:
+    """產生表格為主的 PDF：每頁一個以線條繪製格線的 12x5 表格"""
+    rng = random.Random(seed)
+    doc = pymupdf.open()
+    rows, cols = 12, 5
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 60), f"Table {i + 1}", fontsize=14)
+        x0, y0, width, height = 72, 80, 90, 24
+        shape = page.new_shape()
+        for r in range(rows + 1):
+            shape.draw_line((x0, y0 + r * height), (x0 + cols * width, y0 + r * height))
+        for c in range(cols + 1):
+            shape.draw_line((x0 + c * width, y0), (x0 + c * width, y0 + rows * height))
+        shape.finish(color=(0, 0, 0), width=0.5)
+        shape.commit()
+        for r in range(rows):
+            for c in range(cols):
+                cell = rng.choice(WORDS) if r else f"col {c + 1}"
+                page.insert_text((x0 + c * width + 4, y0 + r * height + 16), cell, fontsize=9)
+    doc.set_toc([[1, f"Table {i + 1}", i + 1] for i in range(pages)])
+    doc.save(path)
+    doc.close()
+
+
+def build_image_pdf(path: pathlib.Path, pages: int, seed: int = 0) -> None:
+    """產生圖片為主的 PDF：每頁兩張內容不同的點陣圖與一段說明文字"""
+    rng = random.Random(seed)
+    doc = pymupdf.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 60), f"Figure {i + 1}", fontsize=14)
+        for n, top in enumerate((80, 420)):
+            pix = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 240, 160), 0)
+            pix.set_rect(pix.irect, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+            for _ in range(200):
+                pix.set_pixel(rng.randrange(240), rng.randrange(160), (rng.randrange(256),) * 3)
+            page.insert_image(pymupdf.Rect(72, top, 492, top + 280), pixmap=pix)
+            page.insert_text((72, top + 300), f"Caption {i + 1}.{n + 1}", fontsize=9)
+    doc.set_toc([[1, f"Figure {i + 1}", i + 1] for i in range(pages)])
+    doc.save(path)
+    doc.close()
+
+
+BUILDERS = {"text": build_text_pdf, "table": build_table_pdf, "image": build_image_pdf}
+
+
+def _peak_rss_mb() -> float | None:
+    """目前行程的記憶體峰值（MB）；Linux 的 ru_maxrss 單位為 KB，macOS 為 bytes"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(
+    input_path: str, output_dir: str, options: dict[str, Any], profile_path: str | None
+) -> tuple[float, dict[str, float], float | None]:
+    """子行程工作：執行一次轉換，回傳（總秒數, 各階段耗時, 記憶體峰值 MB）"""
+    timings: dict[str, float] = {}
+    kwargs = dict(
+        image_dir=str(pathlib.Path(output_dir) / "images"),
+        show_progress=False,
+        timings=timings,
+        **options,
+    )
+    output_path = str(pathlib.Path(output_dir) / "out.md")
+    profiler = cProfile.Profile() if profile_path else None
+    start = time.perf_counter()
+    if profiler:
+        profiler.runcall(pdf_to_markdown.pdf_to_markdown, input_path, output_path, **kwargs)
+        profiler.dump_stats(profile_path)
+    else:
+        pdf_to_markdown.pdf_to_markdown(input_path, output_path, **kwargs)
+    return time.perf_counter() - start, timings, _peak_rss_mb()
+
+
+def main() -> None:
+    """依參數產生測試文件並執行所有選項組合"""
+    parser = argparse.ArgumentParser(description="pdf_to_markdown 轉換效能基準測試")
+    parser.add_argument("--pages", default="20", help="以逗號分隔的頁數")
+    parser.add_argument("--kinds", default="text,table,image", help=f"文件類型：{','.join(BUILDERS)}")
+    parser.add_argument("--strategies", default="lines_strict,lines,none", help="table_strategy 選項")
+    parser.add_argument("--toc", default="on,off", help="use_toc 選項（on/off）")
+    parser.add_argument("--images", default="on,off", help="write_images 選項（on/off）")
+    parser.add_argument("--dpi", default="150", help="以逗號分隔的圖片解析度")
+    parser.add_argument("--profile-dir", help="輸出每個案例 cProfile 結果（.prof）的目錄")
+    parser.add_argument("--csv", help="將結果另存為 CSV 檔")
+    args = parser.parse_args()
+
+    page_counts = [int(n) for n in args.pages.split(",")]
+    kinds = args.kinds.split(",")
+    switches = {"on": True, "off": False}
+    matrix = list(
+        itertools.product(
+            args.strategies.split(","),
+            [switches[v] for v in args.toc.split(",")],
+            [switches[v] for v in args.images.split(",")],
+            [int(d) for d in args.dpi.split(",")],
+        )
+    )
+    profile_dir = pathlib.Path(args.profile_dir) if args.profile_dir else None
+    if profile_dir:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+
+    print(
+        f"{'案例':<12} {'策略':<12} {'TOC':>3} {'圖片':>3} {'dpi':>4} {'頁/秒':>7} "
+        f"{'open':>6} {'headers':>7} {'convert':>7} {'write':>6} {'RSS MB':>7}"
+    )
+    # 每個案例在新的子行程執行，記憶體峰值與模組快取不受前一個案例影響
+    context = multiprocessing.get_context("spawn")
+    rows: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = pathlib.Path(tmp)
+        for kind, pages in itertools.product(kinds, page_counts):
+            input_path = work_dir / f"{kind}_{pages}.pdf"
+            BUILDERS[kind](input_path, pages)
+            for strategy, use_toc, write_images, dpi in matrix:
+                name = f"{kind}[{pages}]"
+                case_id = f"{kind}_{pages}_{strategy}_{'toc' if use_toc else 'notoc'}_{'img' if write_images else 'noimg'}_{dpi}"
+                options = dict(table_strategy=strategy, use_toc=use_toc, write_images=write_images, dpi=dpi)
+                profile_path = str(profile_dir / f"{case_id}.prof") if profile_dir else None
+                output_dir = work_dir / case_id
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    elapsed, timings, rss = executor.submit(
+                        run_case, str(input_path), str(output_dir), options, profile_path
+                    ).result()
+                rows.append(
+                    {"kind": kind, "pages": pages, **options, "pages_per_sec": pages / elapsed, **timings, "peak_rss_mb": rss}
+                )
+                rss_text = f"{rss:>7.1f}" if rss is not None else f"{'-':>7}"
+                print(
+                    f"{name:<14} {strategy:<12} {'on' if use_toc else 'off':>3} "
+                    f"{'on' if write_images else 'off':>3} {dpi:>4} {pages / elapsed:>7.1f} "
+                    f"{timings.get('open', 0):>6.2f} {timings.get('headers', 0):>7.2f} "
+                    f"{timings.get('convert', 0):>7.2f} {timings.get('write', 0):>6.2f} {rss_text}"
+                )
+    if args.csv and rows:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(dict.fromkeys(key for row in rows for key in row)))
+            writer.writeheader()
+            writer.writerows(rows)
+    if profile_dir:
+        print(f"cProfile 結果已輸出至 {profile_dir}，可用 python -m pstats <檔案> 檢視")
+
+
+if __name__ == "__main__":
+    main()
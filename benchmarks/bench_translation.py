@@ -0,0 +1,176 @@
+# /// script
+# requires-python = ">=3.13"
+# dependencies = [
+#     "google-genai",
+#     "dotenv",
+# ]
+# ///
+"""翻譯工具的離線吞吐量基準測試
+
+以 fake_gemini 的假客戶端取代 Gemini API，對不同大小的合成 .properties
+與 Markdown 文件執行完整的 i18n_props / i18n_tool 流程，並輸出
+每秒處理行數、請求數、送出 token 數與記憶體峰值。
+
+執行方式：
+    uv run benchmarks/bench_translation.py [--sizes 500,2000,10000] [--profile flaky]
+"""
+
+import argparse
+import logging
+import pathlib
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+BENCH_DIR = pathlib.Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+
+import i18n_props  # noqa: E402
+import i18n_tool  # noqa: E402
+from fake_gemini import FakeGeminiClient, FakeGeminiConfig  # noqa: E402
+
+# 模擬的 API 行為設定
+PROFILES = {
+    "clean": FakeGeminiConfig(latency=0.05, latency_per_1k_tokens=0.02),
+    "flaky": FakeGeminiConfig(
+        latency=0.05,
+        latency_per_1k_tokens=0.02,
+        error_rate=0.03,
+        rate_limit_rate=0.03,
+        malformed_rate=0.05,
+    ),
+}
+
+# 合成資料使用的詞彙與重複出現的訊息前綴
+WORDS = ["授信", "帳戶", "通知", "簽核", "查詢", "資料", "交易", "額度", "申請", "審核"]
+PREFIXES = ["【執行失敗】：", "【執行成功】：", ""]
+
+
+def build_properties(path: pathlib.Path, size: int, seed: int = 0) -> int:
+    """產生含約三成重複值的合成 .properties 檔案，回傳待翻譯行數"""
+    rng = random.Random(seed)
+    pool: list[str] = []
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(size):
+            if i % 50 == 0:
+                f.write(f"# section {i // 50}\n")
+            if pool and rng.random() < 0.3:
+                value = rng.choice(pool)
+            else:
+                value = rng.choice(PREFIXES) + "".join(
+                    rng.choice(WORDS) for _ in range(rng.randint(1, 20))
+                )
+                pool.append(value)
+            f.write(f"key.{i}={value}\n")
+    return size
+
+
+def build_markdown(path: pathlib.Path, size: int, seed: int = 0) -> int:
+    """產生含標題、段落與程式碼區塊的合成 Markdown 文件，回傳行數"""
+    rng = random.Random(seed)
+    lines: list[str] = []
+    for i in range(size // 10):
+        lines.append(f"## 第 {i} 節")
+        lines.append("")
+        for _ in range(5):
+            lines.append("".join(rng.choice(WORDS) for _ in range(rng.randint(5, 40))))
+        lines.append("")
+        lines.append("```python")
+        lines.append(f"print({i})")
+        lines.append("```")
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return len(lines)
+
+
+def run_case(name: str, lines: int, languages: int, client: FakeGeminiClient, job: Callable[[], None]) -> None:
+    """執行單一測試案例並輸出統計列"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    failed = ""
+    try:
+        job()
+    except Exception as e:
+        failed = f"  失敗：{e}"
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = client.stats
+    print(
+        f"{name:<22} {lines:>7} {elapsed:>8.2f} {lines * languages / elapsed:>10.1f} "
+        f"{stats.requests:>6} {stats.errors + stats.rate_limited + stats.malformed:>5} "
+        f"{stats.tokens_in:>10} {peak / 1_000_000:>8.1f}{failed}"
+    )
+
+
+def main() -> None:
+    """依參數執行所有基準測試案例"""
+    parser = argparse.ArgumentParser(description="翻譯工具離線吞吐量基準測試")
+    parser.add_argument("--sizes", default="500,2000,10000", help="以逗號分隔的資料行數")
+    parser.add_argument("--lang", default="en,zh-CN", help="以逗號分隔的目標語言")
+    parser.add_argument("--profile", default="clean", choices=sorted(PROFILES), help="模擬的 API 行為")
+    parser.add_argument("--concurrency", type=int, default=i18n_props.CONFIG["concurrency"], help="同時請求上限")
+    parser.add_argument("--stream", action="store_true", help="以串流模式接收 i18n_props 的回應")
+    parser.add_argument("--glossary", help="詞彙表檔案路徑")
+    parser.add_argument("--context-cache", action="store_true", help="使用 context cache 保存 Prompt")
+    parser.add_argument("--skip-docs", action="store_true", help="略過 i18n_tool 文件翻譯測試")
+    args = parser.parse_args()
+
+    # 模擬的錯誤會由翻譯流程記錄，基準測試只輸出統計表格
+    logging.disable(logging.CRITICAL)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    languages = args.lang.split(",")
+    profile = PROFILES[args.profile]
+    glossary = pathlib.Path(args.glossary).read_text(encoding="utf-8") if args.glossary else ""
+
+    print(f"模擬設定：{args.profile} {profile}")
+    print(
+        f"{'案例':<20} {'行數':>5} {'秒':>8} {'行/秒':>8} "
+        f"{'請求':>4} {'異常':>3} {'送出token':>7} {'峰值MB':>6}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = pathlib.Path(tmp)
+        for size in sizes:
+            bundle = f"bench_{size}"
+            lines = build_properties(work_dir / f"{bundle}.properties", size)
+            client = FakeGeminiClient(profile)
+            run_case(
+                f"i18n_props[{size}]",
+                lines,
+                len(languages),
+                client,
+                lambda: i18n_props.translate_bundles(
+                    client,
+                    work_dir,
+                    [bundle],
+                    languages,
+                    work_dir,
+                    snapshot_dir=work_dir / "snapshots",
+                    concurrency=args.concurrency,
+                    stream=args.stream,
+                    glossary=glossary,
+                    context_cache=args.context_cache,
+                ),
+            )
+
+            if args.skip_docs:
+                continue
+            doc_path = work_dir / f"doc_{size}.md"
+            doc_lines = build_markdown(doc_path, size)
+            client = FakeGeminiClient(profile)
+            run_case(
+                f"i18n_tool[{size}]",
+                doc_lines,
+                len(languages),
+                client,
+                lambda: i18n_tool.translate_document(
+                    client, i18n_tool.CONFIG["gemini_model"], doc_path, languages
+                ),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# /// script
+# requires-python = ">=3.13"
+# ///
+"""utils.unicode 編解碼效能微基準測試
+
+比較目前的實作與原本逐字元 / 正規表示式回呼版本的吞吐量（MB/s）。
+
+執行方式：
+    uv run benchmarks/bench_unicode.py [--size-mb 8] [--repeat 5]
+"""
+
+import argparse
+import io
+import pathlib
+import re
+import sys
+import time
+from typing import Callable
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "src"))
+
+from utils.unicode import (  # noqa: E402
+    escape_non_ascii,
+    escape_stream,
+    unescape_stream,
+    unescape_unicode,
+)
+
+# 模擬 .properties 內容：中文鍵值、ASCII 鍵值與少量 emoji
+SAMPLE_LINES = [
+    "簽核通知=簽核通知\n",
+    "【執行失敗】：請先輸入授信戶資訊=【執行失敗】：請先輸入授信戶資訊\n",
+    "app.title=Credit Review System\n",
+    "greeting=歡迎使用 😀\n",
+]
+
+# 解碼的邊界案例（輸入, 預期結果）：反斜線後接 U+00FF 以上的字元，且同一字串含 \uXXXX
+UNESCAPE_CASES = [
+    ("C:\\路徑 \\u0041", "C:\\路徑 A"),
+    ("\\中\\u4e2d", "\\中中"),
+    ("path\\😀 \\u0041", "path\\😀 A"),
+]
+
+
+def legacy_unescape_unicode(text: str) -> str:
+    """原本以正規表示式搭配 lambda 的解碼實作"""
+    return re.sub(r"\\u([0-9a-fA-F]{4})", lambda m: chr(int(m.group(1), 16)), text)
+
+
+def legacy_escape_non_ascii(text: str) -> str:
+    """原本逐字元處理的編碼實作"""
+    escaped_text = []
+    for char in text:
+        if ord(char) > 127:
+            escaped_text.append(f"\\u{ord(char):04x}")
+        else:
+            escaped_text.append(char)
+    return "".join(escaped_text)
+
+
+def build_sample(size_mb: float) -> str:
+    """產生約 size_mb MB（UTF-8）的測試文字"""
+    block = "".join(SAMPLE_LINES)
+    repeat = max(int(size_mb * 1_000_000 / len(block.encode("utf-8"))), 1)
+    return block * repeat
+
+
+def measure(func: Callable[[str], object], data: str, repeat: int) -> float:
+    """回傳最佳一次執行的吞吐量（以輸入的 UTF-8 位元組數計算，MB/s）"""
+    size = len(data.encode("utf-8"))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    return size / best / 1_000_000
+
+
+def stream_through(codec: Callable[[io.StringIO, io.StringIO], None]) -> Callable[[str], str]:
+    """將串流版本包裝為字串輸入 / 輸出的函式"""
+
+    def run(data: str) -> str:
+        target = io.StringIO()
+        codec(io.StringIO(data), target)
+        return target.getvalue()
+
+    return run
+
+
+def check_unescape_cases() -> None:
+    """驗證邊界案例的解碼結果，串流版本以各種區塊大小切開輸入"""
+    for text, expected in UNESCAPE_CASES:
+        assert unescape_unicode(text) == expected, (text, unescape_unicode(text))
+        for chunk_size in range(1, len(text) + 1):
+            target = io.StringIO()
+            unescape_stream(io.StringIO(text), target, chunk_size)
+            assert target.getvalue() == expected, (text, chunk_size, target.getvalue())
+
+
+def main() -> None:
+    """執行基準測試並輸出結果表格"""
+    parser = argparse.ArgumentParser(description="utils.unicode 編解碼效能比較")
+    parser.add_argument("--size-mb", type=float, default=8.0, help="測試資料大小（MB）")
+    parser.add_argument("--repeat", type=int, default=5, help="每項測試重複次數（取最佳值）")
+    args = parser.parse_args()
+
+    text = build_sample(args.size_mb)
+    escaped = escape_non_ascii(text)
+    # 原本的實作不處理代理對，解碼比對只以 BMP 範圍的內容驗證
+    bmp_text = text.replace("😀", "")
+    assert legacy_escape_non_ascii(bmp_text) == escape_non_ascii(bmp_text)
+    assert unescape_unicode(escaped) == text
+    check_unescape_cases()
+
+    cases = [
+        ("escape   legacy", legacy_escape_non_ascii, text),
+        ("escape   current", escape_non_ascii, text),
+        ("escape   stream", stream_through(escape_stream), text),
+        ("unescape legacy", legacy_unescape_unicode, escaped),
+        ("unescape current", unescape_unicode, escaped),
+        ("unescape stream", stream_through(unescape_stream), escaped),
+    ]
+    print(f"測試資料：{len(text.encode('utf-8')) / 1_000_000:.1f} MB，重複 {args.repeat} 次")
+    for name, func, data in cases:
+        print(f"{name:<18} {measure(func, data, args.repeat):>8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""離線的 Gemini 替身（in-process fake client）
+
+提供與 `google.genai.Client` 相同呼叫介面的假客戶端（`models.generate_content`、
+`aio.models.generate_content`、`aio.models.generate_content_stream` 與
+`caches.create` / `caches.delete`），不需網路與 API 金鑰即可執行翻譯流程。
+可設定延遲、錯誤率、速率限制回應與格式錯誤的 JSON 回應，並統計
+請求數與 token 數，供基準測試使用。
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, AsyncIterator
+
+# 從翻譯 Prompt 中擷取目標語言，例如「翻譯成 en 語系」、「翻譯為 zh-CN 語系」
+_LANGUAGE_PATTERN = re.compile(r"翻譯(?:成|為)\s*(\S+?)\s*語系")
+
+
+class FakeRateLimitError(Exception):
+    """模擬 429 RESOURCE_EXHAUSTED 回應"""
+
+    code = 429
+
+
+class FakeServerError(Exception):
+    """模擬 503 UNAVAILABLE 回應"""
+
+    code = 503
+
+
+@dataclass
+class FakeGeminiConfig:
+    """假客戶端的行為設定"""
+
+    # 每次請求的基本延遲（秒）
+    latency: float = 0.05
+    # 每 1,000 個輸出 token 額外增加的延遲（秒），模擬長回應較慢
+    latency_per_1k_tokens: float = 0.0
+    # 回傳一般錯誤（503）的機率
+    error_rate: float = 0.0
+    # 回傳速率限制錯誤（429）的機率
+    rate_limit_rate: float = 0.0
+    # 回傳被截斷、無法解析之 JSON 的機率
+    malformed_rate: float = 0.0
+    # 每分鐘請求數上限，超過時回傳 429；0 表示不限制
+    rpm_limit: int = 0
+    # 串流回應時每個區塊的字元數
+    stream_chunk_chars: int = 200
+    # 建立 context cache 所需的最小 token 數，低於此值時拋出錯誤（模擬真實 API 限制）
+    min_cache_tokens: int = 1024
+    # 亂數種子，讓每次測試結果可重現
+    seed: int = 0
+
+
+@dataclass
+class FakeGeminiStats:
+    """假客戶端的累計統計"""
+
+    requests: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    malformed: int = 0
+    tokens_in: int = 0
+    tokens_cached: int = 0
+    tokens_out: int = 0
+    request_times: deque = field(default_factory=deque)
+
+
+@dataclass
+class FakeResponse:
+    """模擬 GenerateContentResponse，只提供 text 屬性"""
+
+    text: str
+
+
+def count_tokens(text: str) -> int:
+    """粗估 token 數：ASCII 約 4 字元一個 token，其餘字元各算一個"""
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars)
+
+
+def _content_text(content: Any) -> str:
+    """取出 contents 中單一元素的文字（字串或具 text 屬性的物件）"""
+    return content if isinstance(content, str) else str(getattr(content, "text", ""))
+
+
+class FakeGeminiBackend:
+    """決定每次請求的結果並記錄統計，同步與非同步介面共用"""
+
+    def __init__(self, config: FakeGeminiConfig | None = None) -> None:
+        self.config = config or FakeGeminiConfig()
+        self.stats = FakeGeminiStats()
+        self.caches: dict[str, str] = {}
+        self._random = random.Random(self.config.seed)
+
+    def create_cache(self, cache_config: Any) -> SimpleNamespace:
+        """建立 context cache，內容不足最小 token 數時拋出錯誤"""
+        instruction = _content_text(getattr(cache_config, "system_instruction", "") or "")
+        tokens = count_tokens(instruction)
+        if tokens < self.config.min_cache_tokens:
+            raise FakeServerError(
+                f"400 INVALID_ARGUMENT: cached content is too small ({tokens} tokens)"
+            )
+        name = f"cachedContents/fake-{len(self.caches)}"
+        self.caches[name] = instruction
+        self.stats.tokens_in += tokens
+        return SimpleNamespace(name=name)
+
+    def delete_cache(self, name: str) -> None:
+        """刪除 context cache"""
+        self.caches.pop(name, None)
+
+    def _instruction(self, config: Any) -> tuple[str, bool]:
+        """取出請求附帶的 Prompt（system instruction 或 cache 內容）及是否來自 cache"""
+        cached_name = getattr(config, "cached_content", None)
+        if cached_name:
+            if cached_name not in self.caches:
+                raise FakeServerError(f"404 NOT_FOUND: {cached_name}")
+            return self.caches[cached_name], True
+        return _content_text(getattr(config, "system_instruction", "") or ""), False
+
+    def _check_rate_limit(self) -> bool:
+        """以滑動視窗判斷是否超過每分鐘請求數上限"""
+        if not self.config.rpm_limit:
+            return False
+        now = time.monotonic()
+        times = self.stats.request_times
+        while times and now - times[0] > 60:
+            times.popleft()
+        if len(times) >= self.config.rpm_limit:
+            return True
+        times.append(now)
+        return False
+
+    def respond(self, contents: list[Any], config: Any = None) -> tuple[float, str | Exception]:
+        """產生一次請求的結果
+
+        Returns:
+            （應模擬的延遲秒數, 回應文字或應拋出的例外）
+        """
+        texts = [_content_text(content) for content in contents]
+        self.stats.requests += 1
+        self.stats.tokens_in += sum(count_tokens(text) for text in texts)
+        try:
+            instruction, cached = self._instruction(config)
+        except FakeServerError as e:
+            self.stats.errors += 1
+            return self.config.latency, e
+        if cached:
+            self.stats.tokens_cached += count_tokens(instruction)
+        else:
+            self.stats.tokens_in += count_tokens(instruction)
+
+        if self._check_rate_limit() or self._random.random() < self.config.rate_limit_rate:
+            self.stats.rate_limited += 1
+            return self.config.latency, FakeRateLimitError("429 RESOURCE_EXHAUSTED")
+        if self._random.random() < self.config.error_rate:
+            self.stats.errors += 1
+            return self.config.latency, FakeServerError("503 UNAVAILABLE")
+
+        prompt = "\n".join([instruction, *texts[:-1]])
+        match = _LANGUAGE_PATTERN.search(prompt)
+        language = match.group(1) if match else "xx"
+        payload = texts[-1] if texts else ""
+        try:
+            values = json.loads(payload)
+        except json.JSONDecodeError:
+            values = None
+
+        if isinstance(values, dict):
+            # 批次翻譯：回傳 {索引: 譯文}，並包上 Markdown 程式碼區塊模擬真實回應
+            translated = {key: f"[{language}] {value}" for key, value in values.items()}
+            text = "```json\n" + json.dumps(translated, ensure_ascii=False, indent=2) + "\n```"
+            if self._random.random() < self.config.malformed_rate:
+                self.stats.malformed += 1
+                text = text[: len(text) // 2]
+        else:
+            # 整份文件翻譯：逐行加上語言標記
+            text = "\n".join(
+                f"[{language}] {line}" if line.strip() else line for line in payload.split("\n")
+            )
+
+        tokens_out = count_tokens(text)
+        self.stats.tokens_out += tokens_out
+        delay = self.config.latency + tokens_out / 1000 * self.config.latency_per_1k_tokens
+        return delay, text
+
+
+class _Models:
+    """同步的 client.models 介面"""
+
+    def __init__(self, backend: FakeGeminiBackend) -> None:
+        self._backend = backend
+
+    def generate_content(self, model: str, contents: list[Any], config: Any = None) -> FakeResponse:
+        delay, result = self._backend.respond(contents, config)
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return FakeResponse(result)
+
+
+class _AsyncModels:
+    """非同步的 client.aio.models 介面"""
+
+    def __init__(self, backend: FakeGeminiBackend) -> None:
+        self._backend = backend
+
+    async def generate_content(
+        self, model: str, contents: list[Any], config: Any = None
+    ) -> FakeResponse:
+        delay, result = self._backend.respond(contents, config)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return FakeResponse(result)
+
+    async def generate_content_stream(
+        self, model: str, contents: list[Any], config: Any = None
+    ) -> AsyncIterator[FakeResponse]:
+        """模擬串流回應：總延遲平均分攤到各區塊，錯誤在第一個區塊前拋出"""
+        delay, result = self._backend.respond(contents, config)
+        chunk_chars = max(self._backend.config.stream_chunk_chars, 1)
+
+        async def chunks() -> AsyncIterator[FakeResponse]:
+            if isinstance(result, Exception):
+                await asyncio.sleep(delay)
+                raise result
+            count = max(-(-len(result) // chunk_chars), 1)
+            for start in range(0, len(result), chunk_chars):
+                await asyncio.sleep(delay / count)
+                yield FakeResponse(result[start : start + chunk_chars])
+
+        return chunks()
+
+
+class _Caches:
+    """client.caches / client.aio.caches 介面"""
+
+    def __init__(self, backend: FakeGeminiBackend, is_async: bool) -> None:
+        self._backend = backend
+        self._is_async = is_async
+
+    def create(self, model: str, config: Any = None) -> Any:
+        if not self._is_async:
+            return self._backend.create_cache(config)
+
+        async def create_async() -> SimpleNamespace:
+            return self._backend.create_cache(config)
+
+        return create_async()
+
+    def delete(self, name: str) -> Any:
+        if not self._is_async:
+            return self._backend.delete_cache(name)
+
+        async def delete_async() -> None:
+            self._backend.delete_cache(name)
+
+        return delete_async()
+
+
+class FakeGeminiClient:
+    """可直接取代 genai.Client 傳入翻譯流程的假客戶端"""
+
+    def __init__(self, config: FakeGeminiConfig | None = None) -> None:
+        self.backend = FakeGeminiBackend(config)
+        self.models = _Models(self.backend)
+        self.caches = _Caches(self.backend, is_async=False)
+        self.aio = SimpleNamespace(
+            models=_AsyncModels(self.backend), caches=_Caches(self.backend, is_async=True)
+        )
+
+    @property
+    def stats(self) -> FakeGeminiStats:
+        """目前的累計統計"""
+        return self.backend.stats
@@ -1,40 +1,375 @@
+# /// script
+# requires-python = ">=3.13"
+# dependencies = [
+#     "httpx",
+#     "load-dotenv",
+#     "numpy",
+# ]
+# ///
+"""financialdatasets.ai 財務指標查詢工具
+
+以單一連線池（keep-alive）的非同步 HTTP 客戶端同時查詢多檔股票、多種期間的
+financial-metrics；以令牌桶限制每分鐘請求數，429 與 5xx 回應以指數退避重試。
+回應保存在本機 SQLite 快取，有效期限依期間而定（年報資料很少變動，保存較久）。
+查詢結果可追加至本機的欄式儲存區（utils.metrics_store），並以向量化計算
+輸出跨股票的成長率、移動平均與排名。
+
+執行方式：
+    uv run src/financial.py [--tickers NVDA,AAPL] [--periods annual,quarterly]
+        [--limit 30] [--concurrency 8] [--rpm 60] [--refresh] [--output metrics.json]
+        [--store] [--screen revenue_growth [--window 4]]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
 import os
-import requests
+import pathlib
+import time
+from typing import Any
+
+import httpx
+import numpy as np
 from dotenv import load_dotenv
 
-# 載入環境變數
-load_dotenv()
+from utils.metrics_store import MetricsStore, cross_sectional_rank, growth_rate, rolling_mean
+from utils.rate_limit import AsyncRateLimiter
+from utils.response_cache import ResponseCache
 
-# 設定 API 金鑰
-api_key = os.environ.get("FINANCIAL_DATASETS_API_KEY")
+# 設定參數
+CONFIG = {
+    # API 位址
+    "base_url": "https://api.financialdatasets.ai",
+    # 預設查詢的股票代號（目前使用的 token 只能查詢免費的股票代號）
+    "tickers": ["NVDA"],
+    # 預設查詢的期間，可為 annual、quarterly 或 ttm
+    "periods": ["annual"],
+    # 每次查詢回傳的期數
+    "limit": 30,
+    # 同時請求數上限（亦為連線池大小）
+    "concurrency": 8,
+    # 每分鐘請求數上限，0 表示不限制
+    "requests_per_minute": 60,
+    # 失敗時的重試次數
+    "retries": 3,
+    # 第一次重試前的等待秒數，之後每次加倍
+    "backoff": 1.0,
+    # 單一請求的逾時秒數
+    "timeout": 30,
+    # 回應快取資料庫路徑
+    "cache_path": ".financial_cache/responses.sqlite3",
+    # 各期間的快取有效秒數：年報很少變動，季報與 TTM 隨財報發布更新
+    "cache_ttl": {
+        "annual": 7 * 24 * 3600,
+        "quarterly": 24 * 3600,
+        "ttm": 12 * 3600,
+    },
+    # 欄式指標儲存目錄
+    "store_path": ".financial_cache/metrics",
+    # --screen 移動平均的期數
+    "rolling_window": 4,
+}
 
-if not api_key:
-    print(
-        "錯誤：找不到 FINANCIAL_DATASETS_API_KEY 環境變數。請確定 .env 檔案存在且包含 FINANCIAL_DATASETS_API_KEY。"
+# 可查詢的期間
+PERIODS = ("annual", "quarterly", "ttm")
+
+# 需要重試的 HTTP 狀態碼
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class FinancialDatasetsClient:
+    """financialdatasets.ai API 客戶端
+
+    須以 `async with` 使用，所有請求共用同一個連線池；
+    傳入 cache 時會先查詢本機快取，未命中才送出請求（refresh 時一律重新查詢並更新快取）。
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        base_url: str = CONFIG["base_url"],
+        concurrency: int = CONFIG["concurrency"],
+        requests_per_minute: int = CONFIG["requests_per_minute"],
+        retries: int = CONFIG["retries"],
+        backoff: float = CONFIG["backoff"],
+        timeout: float = CONFIG["timeout"],
+        cache: ResponseCache | None = None,
+        cache_ttl: dict[str, float] = CONFIG["cache_ttl"],
+        refresh: bool = False,
+    ) -> None:
+        self.api_key = api_key
+        self.base_url = base_url
+        self.concurrency = max(concurrency, 1)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.refresh = refresh
+        # 實際送出的請求數（不含快取命中）
+        self.requests = 0
+        self._limiter = AsyncRateLimiter(requests_per_minute)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._client: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> "FinancialDatasetsClient":
+        limits = httpx.Limits(
+            max_connections=self.concurrency, max_keepalive_connections=self.concurrency
+        )
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"X-API-KEY": self.api_key},
+            timeout=self.timeout,
+            limits=limits,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._client.aclose()
+        self._client = None
+
+    async def _get(self, path: str, params: dict[str, Any]) -> dict[str, Any]:
+        """送出 GET 請求並回傳 JSON，429 與 5xx 回應及連線錯誤以指數退避重試"""
+        for attempt in range(self.retries + 1):
+            wait = self.backoff * (2**attempt)
+            try:
+                async with self._semaphore:
+                    await self._limiter.acquire()
+                    self.requests += 1
+                    response = await self._client.get(path, params=params)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return response.json()
+                # 伺服器指定的 Retry-After（秒）優先於退避時間
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    wait = max(wait, float(retry_after))
+                error: Exception = httpx.HTTPStatusError(
+                    f"HTTP {response.status_code}", request=response.request, response=response
+                )
+            except httpx.TransportError as e:
+                error = e
+            if attempt < self.retries:
+                print(f"Retrying {path} {params} in {wait:.1f}s ({error!r})")
+                await asyncio.sleep(wait)
+        raise error
+
+    async def get_financial_metrics(
+        self, ticker: str, period: str = "annual", limit: int = CONFIG["limit"]
+    ) -> list[dict[str, Any]]:
+        """查詢單一股票的財務指標
+
+        Args:
+            ticker: 股票代號
+            period: annual、quarterly 或 ttm
+            limit: 回傳的期數
+
+        Returns:
+            各期的財務指標（由新到舊）
+        """
+        if period not in PERIODS:
+            raise ValueError(f"不支援的期間：{period}（可用：{', '.join(PERIODS)}）")
+        ticker = ticker.upper()
+        key = f"financial-metrics|{ticker}|{period}|{limit}"
+        if self.cache is not None and not self.refresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        data = await self._get(
+            "/financial-metrics", {"ticker": ticker, "period": period, "limit": limit}
+        )
+        metrics = data.get("financial_metrics") or []
+        if self.cache is not None:
+            self.cache.set(key, metrics, self.cache_ttl[period])
+        return metrics
+
+    async def get_many_financial_metrics(
+        self, tickers: list[str], periods: list[str], limit: int = CONFIG["limit"]
+    ) -> tuple[dict[tuple[str, str], list[dict[str, Any]]], dict[tuple[str, str], Exception]]:
+        """同時查詢多檔股票、多種期間的財務指標
+
+        單一查詢失敗不影響其他查詢，失敗的查詢與例外另外回傳。
+
+        Args:
+            tickers: 股票代號
+            periods: 期間
+            limit: 每次查詢回傳的期數
+
+        Returns:
+            （{(股票代號, 期間): 財務指標}, {(股票代號, 期間): 例外}）
+        """
+        unique_tickers = dict.fromkeys(ticker.upper() for ticker in tickers)
+        keys = [(ticker, period) for ticker in unique_tickers for period in periods]
+        results = await asyncio.gather(
+            *(self.get_financial_metrics(ticker, period, limit) for ticker, period in keys),
+            return_exceptions=True,
+        )
+        metrics: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        errors: dict[tuple[str, str], Exception] = {}
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                errors[key] = result
+            else:
+                metrics[key] = result
+        return metrics, errors
+
+
+def parse_arguments() -> argparse.Namespace:
+    """解析命令列參數"""
+    parser = argparse.ArgumentParser(description="查詢 financialdatasets.ai 財務指標")
+    parser.add_argument(
+        "--tickers",
+        default=",".join(CONFIG["tickers"]),
+        help="以逗號分隔的股票代號（預設：%(default)s）",
+    )
+    parser.add_argument(
+        "--periods",
+        default=",".join(CONFIG["periods"]),
+        help=f"以逗號分隔的期間：{', '.join(PERIODS)}（預設：%(default)s）",
+    )
+    parser.add_argument(
+        "--limit", type=int, default=CONFIG["limit"], help="回傳的期數（預設：%(default)s）"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=CONFIG["concurrency"],
+        help="同時請求數上限（預設：%(default)s）",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        default=CONFIG["requests_per_minute"],
+        help="每分鐘請求數上限，0 表示不限制（預設：%(default)s）",
     )
-    exit()
+    parser.add_argument(
+        "--refresh", action="store_true", help="略過本機快取，重新查詢並更新快取"
+    )
+    parser.add_argument("--output", help="將結果另存為 JSON 檔（{股票代號: {期間: 財務指標}}）")
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help=f"將結果追加至欄式儲存區（{CONFIG['store_path']}）",
+    )
+    parser.add_argument(
+        "--screen",
+        metavar="METRIC",
+        help="追加至儲存區後，輸出各股票該指標的最新值、成長率、移動平均與排名",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=CONFIG["rolling_window"],
+        help="--screen 移動平均的期數（預設：%(default)s）",
+    )
+    return parser.parse_args()
+
 
-# add your API key to the headers
-headers = {"X-API-KEY": api_key}
+def _format(value: float, spec: str) -> str:
+    """格式化數值，缺值顯示為 -"""
+    return "-" if np.isnan(value) else format(value, spec)
 
-# set your query params
-# 目前使用的token只能查詢免費的股票代號
-ticker = "NVDA"  # stock ticker
-period = "annual"  # possible values are 'annual', 'quarterly', or 'ttm'
-limit = 30  # number of periods to return
 
-# create the URL
-url = (
-    f"https://api.financialdatasets.ai/financial-metrics"
-    f"?ticker={ticker}"
-    f"&period={period}"
-    f"&limit={limit}"
-)
+def print_screen(
+    store: MetricsStore, tickers: list[str], period: str, metric: str, window: int
+) -> None:
+    """以各股票最近一期對齊，輸出指標的最新值、較前一期成長率、移動平均與橫斷面排名"""
+    panel = store.panel(tickers, period, metric)
+    if not panel.values.size:
+        print(f"No stored {period} data for {metric}")
+        return
+    latest = panel.values[:, -1]
+    growth = growth_rate(panel.values)[:, -1]
+    average = rolling_mean(panel.values, window)[:, -1]
+    rank = cross_sectional_rank(panel.values[:, -1:])[:, 0]
+    print(f"{metric} ({period}):")
+    print(f"{'ticker':<8} {'report':<10} {'latest':>14} {'growth':>8} {f'avg{window}':>14} {'rank':>5}")
+    for row in np.argsort(np.where(np.isnan(rank), np.inf, rank), kind="stable"):
+        report = str(panel.dates[row, -1]) if not np.isnat(panel.dates[row, -1]) else "-"
+        print(
+            f"{panel.tickers[row]:<8} {report:<10} {_format(latest[row], '.4g'):>14} "
+            f"{_format(growth[row], '.1%'):>8} {_format(average[row], '.4g'):>14} "
+            f"{_format(rank[row], '.0f'):>5}"
+        )
 
-# make API request
-response = requests.get(url, headers=headers)
 
-# parse financial_metrics from the response
-financial_metrics = response.json().get("financial_metrics")
+async def fetch_all(
+    api_key: str, args: argparse.Namespace, cache: ResponseCache | None
+) -> tuple[dict[tuple[str, str], list[dict[str, Any]]], dict[tuple[str, str], Exception], int]:
+    """依命令列參數查詢所有股票與期間，回傳（結果, 失敗的查詢, 實際請求數）"""
+    async with FinancialDatasetsClient(
+        api_key,
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        cache=cache,
+        refresh=args.refresh,
+    ) as client:
+        metrics, errors = await client.get_many_financial_metrics(
+            args.tickers.split(","), args.periods.split(","), args.limit
+        )
+        return metrics, errors, client.requests
+
+
+def main():
+    args = parse_arguments()
+    # 回應快取的統計以 logging 輸出；httpx 每個請求的紀錄過於冗長，只保留警告
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    # 載入環境變數
+    load_dotenv()
+
+    # 設定 API 金鑰
+    api_key = os.environ.get("FINANCIAL_DATASETS_API_KEY")
+    if not api_key:
+        print(
+            "錯誤：找不到 FINANCIAL_DATASETS_API_KEY 環境變數。請確定 .env 檔案存在且包含 FINANCIAL_DATASETS_API_KEY。"
+        )
+        exit()
+
+    cache = ResponseCache(pathlib.Path(CONFIG["cache_path"]))
+    # 過期資料不會再被讀取，開啟時一併清除，避免快取檔無限成長
+    cache.purge_expired()
+    started = time.perf_counter()
+    try:
+        metrics, errors, requests = asyncio.run(fetch_all(api_key, args, cache))
+        cache.log_stats()
+    finally:
+        cache.close()
+    elapsed = time.perf_counter() - started
+
+    for (ticker, period), error in errors.items():
+        print(f"Error fetching {ticker} ({period}): {error}")
+    if args.output:
+        grouped: dict[str, dict[str, list[dict[str, Any]]]] = {}
+        for (ticker, period), financial_metrics in metrics.items():
+            grouped.setdefault(ticker, {})[period] = financial_metrics
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(grouped, f, ensure_ascii=False, indent=2)
+        print(f"Saved: {args.output}")
+    elif not args.screen:
+        for (ticker, period), financial_metrics in metrics.items():
+            print(f"{ticker} ({period}):")
+            print(financial_metrics)
+
+    if args.store or args.screen:
+        store = MetricsStore(pathlib.Path(CONFIG["store_path"]))
+        added = sum(
+            store.append(ticker, period, financial_metrics)
+            for (ticker, period), financial_metrics in metrics.items()
+        )
+        print(f"Stored {added} new periods in {store.root}")
+        if args.screen:
+            tickers = list(dict.fromkeys(ticker.upper() for ticker in args.tickers.split(",")))
+            for period in args.periods.split(","):
+                print_screen(store, tickers, period, args.screen, args.window)
+    print(
+        f"Fetched {len(metrics)} queries ({len(errors)} failed, {requests} requests) "
+        f"in {elapsed:.1f}s"
+    )
+
 
-print(financial_metrics)
+if __name__ == "__main__":
+    main()
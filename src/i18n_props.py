@@ -8,13 +8,23 @@
 # ///
 import os
 import pathlib
+import hashlib
 import json
 import argparse
+import asyncio
+import contextlib
 import logging
-from typing import List, Tuple, Dict
+import sys
+import unicodedata
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
 from dotenv import load_dotenv
 from google import genai
-from utils.unicode import unescape_unicode, escape_non_ascii
+from utils.api_retry import call_with_retry, is_retryable
+from utils.journal import RunJournal, atomic_write, build_run_key
+from utils.json_stream import IncrementalJsonObjectParser
+from utils.properties import PropertiesWriter, PropertyLine, iter_properties
+from utils.rate_limit import AsyncRateLimiter
+from utils.translation_memory import TranslationMemory
 
 # 設定日誌格式，包含時間戳記和訊息級別
 logging.basicConfig(
@@ -30,12 +40,36 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 CONFIG = {
     # 檔案讀寫的編碼格式
     "file_encoding": "utf-8",
-    # 每次 API 呼叫的翻譯行數
-    "batch_size": 100,
+    # 每次 API 呼叫的預估輸入 token 上限（不含 Prompt）
+    "batch_max_tokens": 4000,
+    # 每次 API 呼叫的翻譯行數上限
+    "batch_max_lines": 200,
+    # 單行翻譯失敗時的重試次數
+    "retry_attempts": 2,
+    # API 暫時性錯誤（429、5xx、連線錯誤）的重試次數
+    "request_retries": 5,
+    # 第一次重試前的等待秒數，之後每次加倍
+    "retry_backoff": 1.0,
     # 預設翻譯目標語言
     "languages": ["en", "zh-CN"],
     # 預設模型
     "gemini_model": os.environ.get("GEMINI_MODEL", "gemini-2.0-flash"),
+    # 同時進行中的 API 請求上限
+    "concurrency": 8,
+    # 每分鐘請求數上限（RPM），0 表示不限制
+    "requests_per_minute": 60,
+    # 每分鐘 token 數上限（TPM），0 表示不限制
+    "tokens_per_minute": 1_000_000,
+    # 翻譯記憶資料庫路徑（相對於專案根目錄）
+    "memory_path": ".i18n_cache/translation_memory.sqlite3",
+    # 翻譯記憶最多保存的筆數
+    "memory_max_entries": 200_000,
+    # 來源檔快照目錄（相對於專案根目錄），供 --incremental 比對變更
+    "snapshot_dir": ".i18n_cache/snapshots",
+    # 工作日誌目錄（相對於專案根目錄），供 --resume 恢復中斷的工作
+    "journal_dir": ".i18n_cache/journal",
+    # Context cache 的存活時間
+    "context_cache_ttl": "3600s",
 }
 
 # 批量翻譯的 Prompt 模板，指導 API 進行翻譯
@@ -57,16 +91,32 @@ BATCH_TRANSLATION_PROMPT = """
 以下是要翻譯的 JSON 物件：
 """
 
+# 附加於 Prompt 之後的詞彙表段落
+GLOSSARY_PROMPT = """
+翻譯時請優先採用以下詞彙表中的譯法：
+{glossary}
+"""
+
+# Prompt 版本識別碼，Prompt 內容變更後翻譯記憶中的舊譯文將不再命中
+PROMPT_VERSION = hashlib.sha256(BATCH_TRANSLATION_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+def build_prompt_version(glossary: str = "") -> str:
+    """計算包含詞彙表內容的 Prompt 版本識別碼，詞彙表變更後舊譯文同樣不再命中"""
+    if not glossary:
+        return PROMPT_VERSION
+    digest = hashlib.sha256((BATCH_TRANSLATION_PROMPT + glossary).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
 def setup_arguments() -> argparse.Namespace:
     """設定並解析命令列參數"""
     parser = argparse.ArgumentParser(
         description="將 .properties 檔案翻譯為指定語言的 .properties 檔案",
-        usage="%(prog)s [--name NAME] [--unicode] [--output-dir DIR] [--lang LANG1,LANG2,...]",
+        usage="%(prog)s [--name NAME1,NAME2,...] [--unicode] [--output-dir DIR] [--lang LANG1,LANG2,...] [--incremental] [--stream] [--resume]",
     )
     parser.add_argument(
         "--name",
         required=True,
-        help="要翻譯的 .properties 檔案名稱（不含 .properties 副檔名）"
+        help="要翻譯的 .properties 檔案名稱（不含 .properties 副檔名），多個檔案以逗號分隔",
     )
     parser.add_argument(
         "--unicode",
@@ -83,6 +133,58 @@ def setup_arguments() -> argparse.Namespace:
         default=",".join(CONFIG["languages"]),
         help="以逗號分隔的目標語言清單，例如：en,zh-CN（預設：en,zh-CN）",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=CONFIG["concurrency"],
+        help=f"同時進行的 API 請求數上限（預設：{CONFIG['concurrency']}）",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        default=CONFIG["requests_per_minute"],
+        help=f"每分鐘請求數上限，0 表示不限制（預設：{CONFIG['requests_per_minute']}）",
+    )
+    parser.add_argument(
+        "--tpm",
+        type=int,
+        default=CONFIG["tokens_per_minute"],
+        help=f"每分鐘 token 數上限，0 表示不限制（預設：{CONFIG['tokens_per_minute']}）",
+    )
+    parser.add_argument(
+        "--memory",
+        default=CONFIG["memory_path"],
+        help=f"翻譯記憶資料庫路徑，相對路徑以專案根目錄為基準（預設：{CONFIG['memory_path']}）",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="停用翻譯記憶，所有內容皆重新送出翻譯",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="僅翻譯新增或變更的鍵，其餘沿用既有輸出檔內容（含人工修改）",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="重播上次中斷工作的日誌，只送出尚未完成的翻譯請求",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="以串流方式接收 API 回應，每筆譯文完成即寫入輸出檔",
+    )
+    parser.add_argument(
+        "--glossary",
+        help="詞彙表檔案路徑，內容會附加在翻譯 Prompt 之後（例如每行「原文=譯文」）",
+    )
+    parser.add_argument(
+        "--context-cache",
+        action="store_true",
+        help="將 Prompt 與詞彙表上傳為 Gemini context cache，每個批次只引用不重送；無法建立時自動改用 system instruction",
+    )
     return parser.parse_args()
 
 def initialize_environment() -> tuple[pathlib.Path, pathlib.Path, genai.Client]:
@@ -100,12 +202,11 @@ def initialize_environment() -> tuple[pathlib.Path, pathlib.Path, genai.Client]:
     client = genai.Client(api_key=google_api_key)
     return script_dir, project_root, client
 
-def read_properties_file(file_path: pathlib.Path) -> List[str]:
-    """讀取 .properties 檔案，並將 Unicode 編碼解碼為可讀字元"""
+def read_properties_file(file_path: pathlib.Path) -> Iterator[PropertyLine]:
+    """串流讀取 .properties 檔案，逐一產生解碼後的邏輯行"""
     try:
         with open(file_path, "r", encoding=CONFIG["file_encoding"]) as f:
-            # 逐行讀取並解碼 Unicode 字元
-            return [unescape_unicode(line) for line in f.readlines()]
+            yield from iter_properties(f)
     except FileNotFoundError:
         logger.error("輸入檔案不存在：%s", file_path)
         raise
@@ -113,109 +214,758 @@ def read_properties_file(file_path: pathlib.Path) -> List[str]:
         logger.error("讀取檔案 %s 時發生錯誤：%s", file_path, e)
         raise
 
-def parse_properties_lines(lines: List[str]) -> Tuple[List[str], List[Tuple[int, str, str]]]:
-    """解析 .properties 檔案，提取待翻譯的鍵值對"""
-    lines_to_translate = []
-    original_lines = [line.rstrip("\n") for line in lines]
-    
-    # 遍歷每一行，識別有效的鍵值對
-    for i, line in enumerate(lines):
-        stripped_line = line.strip()
-        # 忽略空行或註解行
-        if not stripped_line or stripped_line.startswith("#"):
-            continue
-        # 處理 key=value 格式
-        if "=" in stripped_line:
-            key, value = stripped_line.split("=", 1)
-            key, value = key.strip(), value.strip()
-            if value:
-                lines_to_translate.append((i, key, value))
-    
-    return original_lines, lines_to_translate
+def parse_properties_lines(entries: Iterable[PropertyLine]) -> List[Tuple[int, str, str]]:
+    """從邏輯行中提取待翻譯的鍵值對（索引, 鍵, 值），略過註解、空行與空值"""
+    return [
+        (entry.index, entry.key, entry.value)
+        for entry in entries
+        if entry.key is not None and entry.value.strip()
+    ]
+
+def read_existing_translations(output_file: pathlib.Path) -> Dict[str, str]:
+    """讀取既有的翻譯輸出檔，回傳 {鍵: 原始行內容}
+
+    行內容維持檔案中的原樣（不解碼 Unicode），以便沿用時逐位元組保持不變。
+    """
+    if not output_file.is_file():
+        return {}
+    return {
+        entry.key: entry.raw
+        for entry in read_properties_file(output_file)
+        if entry.key is not None
+    }
+
+def load_source_snapshot(snapshot_file: pathlib.Path) -> Dict[str, str] | None:
+    """讀取上次翻譯時的來源快照 {鍵: 原文}，不存在時回傳 None"""
+    if not snapshot_file.is_file():
+        return None
+    with open(snapshot_file, "r", encoding=CONFIG["file_encoding"]) as f:
+        return json.load(f)
+
+def save_source_snapshot(
+    snapshot_file: pathlib.Path, lines_to_translate: List[Tuple[int, str, str]]
+) -> None:
+    """將本次翻譯的來源內容儲存為快照，供下次增量翻譯比對"""
+    with atomic_write(snapshot_file, CONFIG["file_encoding"]) as f:
+        json.dump(
+            {key: value for _, key, value in lines_to_translate},
+            f,
+            ensure_ascii=False,
+            indent=0,
+        )
 
-def translate_batch(
+def select_changed_lines(
+    lines_to_translate: List[Tuple[int, str, str]],
+    existing: Dict[str, str],
+    snapshot: Dict[str, str] | None,
+) -> Tuple[Dict[int, str], List[Tuple[int, str, str]]]:
+    """比對來源、快照與既有輸出，找出需要重新翻譯的行
+
+    鍵已存在於輸出檔且原文與快照相同時沿用既有行；沒有快照時，
+    無法判斷原文是否變更，僅翻譯輸出檔中缺少的鍵。
+
+    Returns:
+        （{行索引: 沿用的既有原始行}, 需要翻譯的行）
+    """
+    preserved: Dict[int, str] = {}
+    changed: List[Tuple[int, str, str]] = []
+    for line in lines_to_translate:
+        index, key, value = line
+        unchanged = snapshot is None or snapshot.get(key) == value
+        if key in existing and unchanged:
+            preserved[index] = existing[key]
+        else:
+            changed.append(line)
+    return preserved, changed
+
+def normalize_value(value: str) -> str:
+    """正規化原文（Unicode NFC、去除前後空白），作為去除重複的比對依據"""
+    return unicodedata.normalize("NFC", value.strip())
+
+def deduplicate_lines(
+    lines_by_bundle: Dict[str, List[Tuple[int, str, str]]],
+) -> Tuple[List[Tuple[int, str, str]], Dict[str, Dict[int, int]]]:
+    """將多個檔案中正規化後相同的原文合併為單一翻譯單元
+
+    Args:
+        lines_by_bundle: 以檔案名稱為鍵、待翻譯行（索引, 鍵, 值）為值的字典
+
+    Returns:
+        （翻譯單元（單元編號, "", 正規化原文）清單, {檔案名稱: {行索引: 單元編號}}）
+    """
+    unit_ids: Dict[str, int] = {}
+    line_units: Dict[str, Dict[int, int]] = {}
+    for bundle, lines_to_translate in lines_by_bundle.items():
+        line_units[bundle] = {}
+        for index, _, value in lines_to_translate:
+            normalized = normalize_value(value)
+            unit_id = unit_ids.setdefault(normalized, len(unit_ids))
+            line_units[bundle][index] = unit_id
+    units = [(unit_id, "", value) for value, unit_id in unit_ids.items()]
+    return units, line_units
+
+def estimate_tokens(text: str) -> int:
+    """粗估文字的 token 數：ASCII 約 4 字元一個 token，其餘字元各算一個"""
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+def parse_translation_response(response_text: str) -> Dict[str, str]:
+    """解析 API 回應文字為索引對應譯文的字典，並移除可能的 Markdown 格式"""
+    response_text = response_text.strip()
+    if response_text.startswith("```json"):
+        response_text = response_text[len("```json") :].rstrip("`").strip()
+    return json.loads(response_text)
+
+def estimate_entry_tokens(index: str, value: str) -> int:
+    """預估單筆 {索引: 原文} 在 JSON 中佔用的 token 數（含引號、逗號等額外負擔）"""
+    return estimate_tokens(value) + len(index) // 4 + 4
+
+def build_batches(lines_to_translate: List[Tuple[int, str, str]]) -> List[Dict[str, str]]:
+    """依預估 token 數將待翻譯行打包為多個 {索引: 原文} 的批次
+
+    每批在不超過 token 上限與行數上限的前提下盡量填滿；
+    單行即超過上限時仍獨立成一批送出。
+    """
+    max_tokens = CONFIG["batch_max_tokens"]
+    max_lines = CONFIG["batch_max_lines"]
+    batches: List[Dict[str, str]] = []
+    current: Dict[str, str] = {}
+    current_tokens = 0
+    for index, _, value in lines_to_translate:
+        index_str = str(index)
+        tokens = estimate_entry_tokens(index_str, value)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_lines):
+            batches.append(current)
+            current, current_tokens = {}, 0
+        current[index_str] = value
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def plan_retry(
+    values: Dict[str, str], translated: Dict[str, str]
+) -> List[Dict[str, str]]:
+    """依批次的翻譯結果規劃重送的子批次
+
+    部分成功時只重送缺少的索引；整批缺漏（回應的 JSON 無法解析）時將批次對半切分，
+    讓單一問題行不會拖累其他行。單行整批缺漏時回傳原批次以供重試。
+    API 錯誤不經過此處，由 call_with_retry 以退避重試。
+    """
+    missing = {index: value for index, value in values.items() if index not in translated}
+    if not missing:
+        return []
+    if len(missing) < len(values) or len(missing) == 1:
+        return [missing]
+    items = list(missing.items())
+    middle = len(items) // 2
+    return [dict(items[:middle]), dict(items[middle:])]
+
+def filter_translations(values: Dict[str, str], translated: Dict[str, str]) -> Dict[str, str]:
+    """只保留批次中實際送出的索引，且譯文須為非空字串"""
+    return {
+        index: translated_value
+        for index, translated_value in translated.items()
+        if index in values and isinstance(translated_value, str) and translated_value.strip()
+    }
+
+def build_system_instruction(language: str, glossary: str = "") -> str:
+    """組合指定語言的翻譯 Prompt 與詞彙表"""
+    instruction = BATCH_TRANSLATION_PROMPT.format(language=language)
+    if glossary:
+        instruction += GLOSSARY_PROMPT.format(glossary=glossary.strip())
+    return instruction
+
+def build_request(
+    values: Dict[str, str],
+    language: str,
+    generate_config: genai.types.GenerateContentConfig | None,
+) -> Tuple[list, genai.types.GenerateContentConfig]:
+    """組出 generate_content 的 contents 與 config
+
+    提供 generate_config（已含 system instruction 或 cached content）時只送出 JSON 資料；
+    否則與過去相同，將 Prompt 與 JSON 一併放入 contents。
+    """
+    payload = json.dumps(values, ensure_ascii=False)
+    if generate_config is not None:
+        return [payload], generate_config
+    prompt = BATCH_TRANSLATION_PROMPT.format(language=language)
+    return [prompt, payload], genai.types.GenerateContentConfig(temperature=0.2)
+
+async def create_generate_configs_async(
+    client: genai.Client,
+    languages: List[str],
+    glossary: str = "",
+    use_cache: bool = False,
+    model: str = CONFIG["gemini_model"],
+) -> Tuple[Dict[str, genai.types.GenerateContentConfig], List[str]]:
+    """為每種語言準備 GenerateContentConfig，Prompt 與詞彙表只需上傳一次
+
+    use_cache 時以 context cache 保存 Prompt 與詞彙表，批次只引用 cache 名稱；
+    cache 無法建立（例如內容低於模型的最小 token 數）時改用 system instruction。
+
+    Returns:
+        （{語言: GenerateContentConfig}, 已建立的 cache 名稱清單）
+    """
+    configs: Dict[str, genai.types.GenerateContentConfig] = {}
+    cache_names: List[str] = []
+    for language in languages:
+        instruction = build_system_instruction(language, glossary)
+        if use_cache:
+            try:
+                cache = await client.aio.caches.create(
+                    model=model,
+                    config=genai.types.CreateCachedContentConfig(
+                        system_instruction=instruction,
+                        display_name=f"i18n-props-{language}",
+                        ttl=CONFIG["context_cache_ttl"],
+                    ),
+                )
+                cache_names.append(cache.name)
+                configs[language] = genai.types.GenerateContentConfig(
+                    temperature=0.2, cached_content=cache.name
+                )
+                logger.info("[%s] 已建立 context cache：%s", language, cache.name)
+                continue
+            except Exception as e:
+                logger.warning("[%s] 無法建立 context cache，改用 system instruction：%s", language, e)
+        configs[language] = genai.types.GenerateContentConfig(
+            temperature=0.2, system_instruction=instruction
+        )
+    return configs, cache_names
+
+async def delete_caches_async(client: genai.Client, cache_names: List[str]) -> None:
+    """刪除本次建立的 context cache，刪除失敗時僅記錄警告（cache 仍會在 TTL 後過期）"""
+    for name in cache_names:
+        try:
+            await client.aio.caches.delete(name=name)
+        except Exception as e:
+            logger.warning("刪除 context cache %s 時發生錯誤：%s", name, e)
+
+async def translate_batch_async(
     client: genai.Client,
     values: Dict[str, str],
     language: str,
     model: str = CONFIG["gemini_model"],
+    generate_config: genai.types.GenerateContentConfig | None = None,
 ) -> Dict[str, str]:
-    """呼叫 Gemini API 進行批量翻譯"""
+    """透過非同步客戶端呼叫 Gemini API 進行批量翻譯
+
+    回應無法解析時回傳空字典，由呼叫端切分批次重送；API 錯誤直接拋出，
+    由呼叫端決定是否重試。
+    """
+    contents, config = build_request(values, language, generate_config)
+    response = await client.aio.models.generate_content(
+        model=model, contents=contents, config=config
+    )
+    # 回應被安全過濾等情況下 text 為 None，視同無法解析
+    response_text = response.text or ""
     try:
-        # 構造翻譯提示並附加 JSON 資料
-        prompt = BATCH_TRANSLATION_PROMPT.format(language=language)
-        response = client.models.generate_content(
-            model=model,
-            contents=[prompt, json.dumps(values, ensure_ascii=False)],
-            config=genai.types.GenerateContentConfig(temperature=0.2),
-        )
-        # 處理 API 回應，移除可能的 Markdown 格式
-        response_text = response.text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[len("```json") :].rstrip("```").strip()
-        return json.loads(response_text)
+        return parse_translation_response(response_text)
     except json.JSONDecodeError as e:
         logger.error("無法解析 API 回應的 JSON 格式：%s", e)
-        logger.debug("API 回應內容：%s", response.text)
-    except Exception as e:
-        logger.error("呼叫翻譯 API 時發生錯誤：%s", e)
+        logger.debug("API 回應內容：%s", response_text)
         return {}
 
-def translate_properties(
-    client: genai.Client,
+def split_by_memory(
     lines_to_translate: List[Tuple[int, str, str]],
     language: str,
-) -> Dict[int, str]:
-    """對所有待翻譯行進行翻譯，分批處理以避免 API 限制"""
-    translated_results = {}
-    batch_size = CONFIG["batch_size"]
-    
-    # 分批處理待翻譯行
-    for i in range(0, len(lines_to_translate), batch_size):
-        batch_info = lines_to_translate[i : i + batch_size]
-        batch_values = {str(index): value for index, _, value in batch_info}
-        logger.info("處理第 %d 批次（共 %d 筆資料）", i // batch_size + 1, len(batch_values))
-        
-        # 執行批量翻譯並儲存結果
-        translated_batch = translate_batch(client, batch_values, language)
-        for idx_str, translated_value in translated_batch.items():
-            translated_results[int(idx_str)] = translated_value.strip()
-    
-    return translated_results
+    memory: TranslationMemory | None,
+) -> Tuple[Dict[int, str], List[Tuple[int, str, str]]]:
+    """以翻譯記憶拆分出已有譯文的行與仍需翻譯的行
 
-def write_output_file(
-    output_file: pathlib.Path,
-    original_lines: List[str],
-    translated_results: Dict[int, str],
+    Returns:
+        （{行索引: 既有譯文}, 仍需送出翻譯的行）
+    """
+    if memory is None:
+        return {}, lines_to_translate
+    found = memory.get_many({value for _, _, value in lines_to_translate}, language)
+    cached = {index: found[value] for index, _, value in lines_to_translate if value in found}
+    remaining = [line for line in lines_to_translate if line[2] not in found]
+    return cached, remaining
+
+def remember_results(
     lines_to_translate: List[Tuple[int, str, str]],
-    use_unicode: bool,
+    translated_results: Dict[int, str],
+    language: str,
+    memory: TranslationMemory | None,
 ) -> None:
-    """將翻譯結果寫入輸出檔案，根據需要轉換為 Unicode 編碼"""
-    output_lines = original_lines.copy()
-    line_info_map = {index: (key, value) for index, key, value in lines_to_translate}
-    
-    # 將翻譯結果應用到對應行
-    for idx, translated_value in translated_results.items():
-        if idx in line_info_map:
-            key, _ = line_info_map[idx]
-            full_line = f"{key}={translated_value}"
-             # 根據參數決定是否轉換為 Unicode 編碼
-            if use_unicode:
-                full_line = escape_non_ascii(full_line)
-            output_lines[idx] = full_line
-    
+    """將新取得的譯文寫入翻譯記憶"""
+    if memory is None:
+        return
+    memory.put_many(
+        (
+            (value, translated_results[index])
+            for index, _, value in lines_to_translate
+            if index in translated_results
+        ),
+        language,
+    )
+
+async def translate_batch_stream_async(
+    client: genai.Client,
+    values: Dict[str, str],
+    language: str,
+    on_pair: Callable[[str, str], None],
+    model: str = CONFIG["gemini_model"],
+    generate_config: genai.types.GenerateContentConfig | None = None,
+) -> Dict[str, str]:
+    """以串流方式呼叫 Gemini API 進行批量翻譯
+
+    每組（索引, 譯文）一完成就透過 on_pair 回報；回應中途中斷時，
+    回傳值仍包含已完整收到的部分。尚未收到任何譯文就失敗時拋出原本的錯誤，
+    由呼叫端決定是否重試。
+    """
+    parser = IncrementalJsonObjectParser()
+    translated: Dict[str, str] = {}
+
+    def accept(pairs: List[Tuple[str, object]]) -> None:
+        for index, translated_value in filter_translations(values, dict(pairs)).items():
+            if index in translated:
+                continue
+            translated[index] = translated_value
+            on_pair(index, translated_value)
+
     try:
-        # 寫入輸出檔案
-        with open(output_file, "w", encoding=CONFIG["file_encoding"]) as f:
-            f.write("\n".join(output_lines))
-        logger.info("翻譯檔案已成功儲存至：%s", output_file)
+        contents, config = build_request(values, language, generate_config)
+        stream = await client.aio.models.generate_content_stream(
+            model=model, contents=contents, config=config
+        )
+        async for chunk in stream:
+            accept(parser.feed(chunk.text or ""))
+        accept(parser.close())
     except Exception as e:
-        logger.error("寫入檔案 %s 時發生錯誤：%s", output_file, e)
+        accept(parser.close())
+        if not translated:
+            raise
+        logger.error("串流翻譯 API 時發生錯誤（已取得 %d 筆）：%s", len(translated), e)
+    return translated
+
+async def translate_languages_async(
+    client: genai.Client,
+    lines_by_language: Dict[str, List[Tuple[int, str, str]]],
+    concurrency: int = CONFIG["concurrency"],
+    limiter: AsyncRateLimiter | None = None,
+    memory: TranslationMemory | None = None,
+    stream: bool = False,
+    on_result: Callable[[str, int, str], None] | None = None,
+    glossary: str = "",
+    context_cache: bool = False,
+) -> Dict[str, Dict[int, str]]:
+    """同時展開所有（語言, 批次）組合進行翻譯，並依語言彙整結果
+
+    Args:
+        client: Gemini API 客戶端
+        lines_by_language: 以目標語言為鍵、待翻譯行（索引, 鍵, 值）為值的字典；
+            索引在同一語言內須唯一（通常為去除重複後的翻譯單元編號）
+        concurrency: 同時進行中的請求上限
+        limiter: 每分鐘請求數 / token 數限制器，None 表示不限制
+        memory: 翻譯記憶，命中的行不會送出翻譯；None 表示停用
+        stream: 是否以串流方式接收回應，逐筆回報譯文
+        on_result: 每取得一筆譯文（含翻譯記憶命中）即呼叫的回呼函式，
+            參數為（語言, 索引, 譯文）
+        glossary: 詞彙表內容，附加在 Prompt 之後
+        context_cache: 是否以 context cache 保存 Prompt 與詞彙表
+
+    Returns:
+        以語言為鍵、{行索引: 譯文}（依索引排序）為值的字典
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    translated: Dict[str, Dict[int, str]] = {}
+    new_results: Dict[str, Dict[int, str]] = {}
+    remaining_by_language: Dict[str, List[Tuple[int, str, str]]] = {}
+    jobs: List[Tuple[str, int, int, Dict[str, str]]] = []
+    for language, lines_to_translate in lines_by_language.items():
+        translated[language], remaining = split_by_memory(lines_to_translate, language, memory)
+        new_results[language] = {}
+        remaining_by_language[language] = remaining
+        batches = build_batches(remaining)
+        jobs.extend(
+            (language, batch_no, len(batches), batch_values)
+            for batch_no, batch_values in enumerate(batches, start=1)
+        )
+        if on_result:
+            for index, translated_value in translated[language].items():
+                on_result(language, index, translated_value)
+    if memory is not None:
+        memory.log_stats()
+
+    # Prompt 與詞彙表每種語言只上傳一次；使用 cache 時批次不再重送這部分的 token
+    languages_with_jobs = list(dict.fromkeys(language for language, *_ in jobs))
+    generate_configs, cache_names = await create_generate_configs_async(
+        client, languages_with_jobs, glossary, context_cache
+    )
+    prompt_tokens = {
+        language: 0 if config.cached_content else estimate_tokens(config.system_instruction)
+        for language, config in generate_configs.items()
+    }
+
+    def emit(language: str, idx_str: str, translated_value: str) -> None:
+        index = int(idx_str)
+        new_results[language][index] = translated_value.strip()
+        if on_result:
+            on_result(language, index, new_results[language][index])
+
+    async def send(language: str, values: Dict[str, str]) -> Dict[str, str]:
+        async with semaphore:
+            if limiter:
+                # 輸出約與輸入等長，因此以兩倍輸入量預估 token 消耗
+                payload_tokens = estimate_tokens(json.dumps(values, ensure_ascii=False))
+                await limiter.acquire(prompt_tokens[language] + payload_tokens * 2)
+            generate_config = generate_configs[language]
+            if stream:
+                return await translate_batch_stream_async(
+                    client,
+                    values,
+                    language,
+                    lambda index, value: emit(language, index, value),
+                    generate_config=generate_config,
+                )
+            return await translate_batch_async(
+                client, values, language, generate_config=generate_config
+            )
+
+    async def request(language: str, values: Dict[str, str]) -> Dict[str, str]:
+        # 429、5xx 與連線錯誤以退避重試（每次重試都重新取得 semaphore 與速率額度），
+        # 不切分批次；切分只用於回應 JSON 缺漏的情況
+        translated = filter_translations(
+            values,
+            await call_with_retry(
+                lambda: send(language, values),
+                CONFIG["request_retries"],
+                CONFIG["retry_backoff"],
+                f"[{language}] 翻譯 {len(values)} 筆資料",
+            ),
+        )
+        if not stream:
+            for idx_str, translated_value in translated.items():
+                emit(language, idx_str, translated_value)
+        return translated
+
+    async def translate_with_retry(
+        language: str, values: Dict[str, str], attempts: int
+    ) -> None:
+        try:
+            translated = await request(language, values)
+        except Exception as e:
+            if not is_retryable(e):
+                raise
+            # 重試後仍失敗的批次保留原文，不寫入快照，下次執行時會重新翻譯
+            logger.error(
+                "[%s] 索引 %s 重試 %d 次後仍翻譯失敗：%s",
+                language,
+                ", ".join(values),
+                CONFIG["request_retries"],
+                e,
+            )
+            return
+        retry_batches = plan_retry(values, translated)
+        if retry_batches == [values]:
+            if attempts <= 0:
+                logger.warning("[%s] 索引 %s 重試後仍翻譯失敗", language, ", ".join(values))
+                return
+            attempts -= 1
+        if retry_batches:
+            logger.info(
+                "[%s] %d 筆未完成，拆成 %d 個批次重送",
+                language,
+                sum(len(retry_values) for retry_values in retry_batches),
+                len(retry_batches),
+            )
+        await asyncio.gather(
+            *(translate_with_retry(language, retry_values, attempts) for retry_values in retry_batches)
+        )
+
+    async def run(
+        language: str, batch_no: int, batch_count: int, batch_values: Dict[str, str]
+    ) -> None:
+        logger.info(
+            "[%s] 處理第 %d/%d 批次（共 %d 筆資料）",
+            language,
+            batch_no,
+            batch_count,
+            len(batch_values),
+        )
+        await translate_with_retry(language, batch_values, CONFIG["retry_attempts"])
+
+    try:
+        await asyncio.gather(*(run(*job) for job in jobs))
+    finally:
+        await delete_caches_async(client, cache_names)
+
+    for language in lines_by_language:
+        remember_results(
+            remaining_by_language[language], new_results[language], language, memory
+        )
+        translated[language].update(new_results[language])
+    return {
+        language: dict(sorted(results.items())) for language, results in translated.items()
+    }
+
+class OrderedOutputWriter:
+    """依來源檔的順序逐行寫出翻譯結果
+
+    譯文可以任意順序到達；每收到一筆就把從目前位置起所有已就緒的行寫出並 flush，
+    只有尚未到達的譯文之後的行會暫時保留，因此暫存檔會隨翻譯進度持續成長，
+    close 時才以 rename 取代輸出檔，中途中斷不會留下寫到一半的輸出檔。
+    """
+
+    def __init__(
+        self,
+        output_file: pathlib.Path,
+        input_file: pathlib.Path,
+        pending_indices: Set[int],
+        use_unicode: bool,
+        preserved_lines: Dict[int, str] | None = None,
+    ) -> None:
+        """
+        Args:
+            output_file: 輸出檔案路徑
+            input_file: 來源檔案路徑，會再串流讀取一次以取得版面
+            pending_indices: 等待譯文的行索引
+            use_unicode: 是否將新寫出的非 ASCII 字元轉為 Unicode 編碼
+            preserved_lines: 原樣寫回的行（增量模式沿用的既有譯文）
+        """
+        self.output_file = output_file
+        self.translated_indices: Set[int] = set()
+        self._pending = set(pending_indices)
+        self._preserved = preserved_lines or {}
+        self._results: Dict[int, str] = {}
+        self._entries = read_properties_file(input_file)
+        self._next_entry: PropertyLine | None = None
+        self._output = contextlib.ExitStack()
+        self._file = self._output.enter_context(
+            atomic_write(output_file, CONFIG["file_encoding"])
+        )
+        self._writer = PropertiesWriter(self._file, ascii_only=use_unicode)
+
+    def add(self, index: int, translated_value: str) -> None:
+        """加入一筆譯文並寫出所有已就緒的行"""
+        if index in self._pending:
+            self._results[index] = translated_value
+            self.flush()
+
+    def flush(self) -> None:
+        """寫出從目前位置起所有已就緒的行"""
+        while True:
+            if self._next_entry is None:
+                self._next_entry = next(self._entries, None)
+                if self._next_entry is None:
+                    break
+            entry = self._next_entry
+            if entry.index in self._preserved:
+                self._writer.write_raw(self._preserved[entry.index])
+            elif entry.index in self._pending and entry.key is not None:
+                if entry.index not in self._results:
+                    break
+                self._writer.write_entry(entry.key, self._results.pop(entry.index))
+                self.translated_indices.add(entry.index)
+            else:
+                self._writer.write_raw(entry.raw)
+            self._next_entry = None
+        self._file.flush()
+
+    def close(self) -> None:
+        """寫出剩餘的行（未取得譯文者保留原文），關閉並以暫存檔取代輸出檔"""
+        try:
+            self._pending = set(self._results)
+            self.flush()
+        except BaseException:
+            # 無法寫完整份檔案時放棄暫存檔，保留原本的輸出檔
+            self.abort()
+            raise
+        else:
+            self._output.close()
+            self._entries.close()
+        logger.info("翻譯檔案已成功儲存至：%s", self.output_file)
+
+    def abort(self) -> None:
+        """放棄暫存檔，保留原本的輸出檔；須在處理例外時呼叫"""
+        try:
+            self._output.__exit__(*sys.exc_info())
+        finally:
+            self._entries.close()
+
+def translate_bundles(
+    client: genai.Client,
+    input_dir: pathlib.Path,
+    bundle_names: List[str],
+    target_languages: List[str],
+    output_dir: pathlib.Path,
+    *,
+    use_unicode: bool = False,
+    incremental: bool = False,
+    snapshot_dir: pathlib.Path,
+    concurrency: int = CONFIG["concurrency"],
+    limiter: AsyncRateLimiter | None = None,
+    memory: TranslationMemory | None = None,
+    stream: bool = False,
+    glossary: str = "",
+    context_cache: bool = False,
+    journal: RunJournal | None = None,
+) -> None:
+    """翻譯多個 .properties 檔案為所有目標語言並寫出結果
+
+    Args:
+        client: Gemini API 客戶端
+        input_dir: 來源檔所在目錄
+        bundle_names: 來源檔名稱（不含 .properties 副檔名）
+        target_languages: 目標語言清單
+        output_dir: 輸出目錄
+        use_unicode: 是否將輸出的非 ASCII 字元轉為 Unicode 編碼
+        incremental: 是否只翻譯新增或變更的鍵
+        snapshot_dir: 來源快照目錄
+        concurrency: 同時進行中的請求上限
+        limiter: 每分鐘請求數 / token 數限制器
+        memory: 翻譯記憶，None 表示停用
+        stream: 是否以串流方式接收 API 回應
+        glossary: 詞彙表內容，附加在 Prompt 之後
+        context_cache: 是否以 context cache 保存 Prompt 與詞彙表
+        journal: 工作日誌；每取得一筆譯文即寫入，日誌中已有的原文不再送出翻譯
+    """
+    # 讀取並解析所有輸入檔案，只保留待翻譯的鍵值對
+    lines_by_bundle: Dict[str, List[Tuple[int, str, str]]] = {}
+    for bundle in bundle_names:
+        entries = read_properties_file(input_dir / f"{bundle}.properties")
+        lines_by_bundle[bundle] = parse_properties_lines(entries)
+
+    # 增量模式下，每種語言只送出新增或原文變更的鍵；
+    # 各檔案中相同的原文再合併為單一翻譯單元，每種語言只翻譯一次
+    units_by_language: Dict[str, List[Tuple[int, str, str]]] = {}
+    line_units_by_language: Dict[str, Dict[str, Dict[int, int]]] = {}
+    preserved: Dict[Tuple[str, str], Dict[int, str]] = {}
+    for language in target_languages:
+        pending_by_bundle: Dict[str, List[Tuple[int, str, str]]] = {}
+        for bundle, lines_to_translate in lines_by_bundle.items():
+            output_name = f"{bundle}_{language}.properties"
+            if not incremental:
+                preserved[bundle, language] = {}
+                pending_by_bundle[bundle] = lines_to_translate
+                continue
+            snapshot = load_source_snapshot(snapshot_dir / f"{output_name}.json")
+            if snapshot is None:
+                logger.warning("[%s] 找不到 %s 的來源快照，僅翻譯輸出檔中缺少的鍵", language, bundle)
+            preserved[bundle, language], pending_by_bundle[bundle] = select_changed_lines(
+                lines_to_translate,
+                read_existing_translations(output_dir / output_name),
+                snapshot,
+            )
+            logger.info(
+                "[%s] %s 增量翻譯：沿用 %d 筆，需翻譯 %d 筆",
+                language,
+                bundle,
+                len(preserved[bundle, language]),
+                len(pending_by_bundle[bundle]),
+            )
+        units, line_units = deduplicate_lines(pending_by_bundle)
+        logger.info(
+            "[%s] 去除重複：%d 筆原文合併為 %d 個翻譯單元",
+            language,
+            sum(len(lines) for lines in pending_by_bundle.values()),
+            len(units),
+        )
+        units_by_language[language] = units
+        line_units_by_language[language] = line_units
+
+    # 從工作日誌恢復上次中斷前已完成的翻譯單元（以正規化原文比對）
+    unit_texts = {
+        language: {unit_id: value for unit_id, _, value in units}
+        for language, units in units_by_language.items()
+    }
+    replayed: Dict[str, Dict[int, str]] = {language: {} for language in target_languages}
+    if journal is not None and journal.records:
+        journaled = {
+            (record["language"], record["source"]): record["translation"]
+            for record in journal.records
+        }
+        for language, units in units_by_language.items():
+            remaining = []
+            for unit in units:
+                translation = journaled.get((language, unit[2]))
+                if translation is None:
+                    remaining.append(unit)
+                else:
+                    replayed[language][unit[0]] = translation
+            units_by_language[language] = remaining
+            remember_results(units, replayed[language], language, memory)
+            logger.info("[%s] 從工作日誌恢復 %d 個翻譯單元", language, len(replayed[language]))
+
+    # 每個輸出檔各有一個依來源順序寫出的 writer，譯文一到就寫入已就緒的行
+    writers: Dict[Tuple[str, str], OrderedOutputWriter] = {}
+    unit_lines: Dict[str, Dict[int, List[Tuple[str, int]]]] = {}
+    try:
+        for language in target_languages:
+            unit_lines[language] = {}
+            for bundle in lines_by_bundle:
+                line_units = line_units_by_language[language][bundle]
+                for index, unit_id in line_units.items():
+                    unit_lines[language].setdefault(unit_id, []).append((bundle, index))
+                writers[bundle, language] = OrderedOutputWriter(
+                    output_dir / f"{bundle}_{language}.properties",
+                    input_dir / f"{bundle}.properties",
+                    set(line_units),
+                    use_unicode,
+                    preserved[bundle, language],
+                )
+                writers[bundle, language].flush()
+
+        def deliver(language: str, unit_id: int, translated_value: str) -> None:
+            for bundle, index in unit_lines[language].get(unit_id, []):
+                writers[bundle, language].add(index, translated_value)
+
+        def on_result(language: str, unit_id: int, translated_value: str) -> None:
+            deliver(language, unit_id, translated_value)
+            if journal is not None:
+                journal.append(
+                    {
+                        "language": language,
+                        "source": unit_texts[language][unit_id],
+                        "translation": translated_value,
+                    }
+                )
+
+        for language, results in replayed.items():
+            for unit_id, translated_value in results.items():
+                deliver(language, unit_id, translated_value)
+
+        # 所有語言的批次同時送出
+        logger.info("--- 開始翻譯為 %s ---", ", ".join(target_languages))
+        asyncio.run(
+            translate_languages_async(
+                client,
+                units_by_language,
+                concurrency=concurrency,
+                limiter=limiter,
+                memory=memory,
+                stream=stream,
+                on_result=on_result,
+                glossary=glossary,
+                context_cache=context_cache,
+            )
+        )
+    except BaseException:
+        # 翻譯中途失敗時不以未完成的譯文（原文）取代既有輸出檔，已完成的譯文
+        # 仍記錄在執行日誌中，可用 --resume 接續
+        for writer in writers.values():
+            writer.abort()
         raise
 
+    for writer in writers.values():
+        writer.close()
+
+    for (bundle, language), writer in writers.items():
+        # 翻譯失敗的鍵不寫入快照，讓下次增量執行時重新翻譯
+        done = writer.translated_indices | preserved[bundle, language].keys()
+        save_source_snapshot(
+            snapshot_dir / f"{bundle}_{language}.properties.json",
+            [line for line in lines_by_bundle[bundle] if line[0] in done],
+        )
+
 def main():
     """主函數"""
     args = setup_arguments()
-    filename_prefix = args.name
+    bundle_names = [name for name in args.name.split(",") if name]
     use_unicode = args.unicode
     output_dir = pathlib.Path(args.output_dir) if args.output_dir else None
     target_languages = args.lang.split(",")
@@ -223,35 +973,67 @@ def main():
     try:
         # 初始化環境和檔案路徑
         _, project_root, client = initialize_environment()
-        input_file = project_root / f"{filename_prefix}.properties"
         output_dir = output_dir or project_root
         
         # 記錄程式執行資訊
         logger.info("*** 專案根目錄：%s", project_root)
-        logger.info("*** 輸入檔案路徑：%s", input_file)
+        for bundle in bundle_names:
+            logger.info("*** 輸入檔案路徑：%s", project_root / f"{bundle}.properties")
         logger.info("*** 輸出檔案編碼：%s", CONFIG["file_encoding"])
         logger.info("*** 是否使用 Unicode 編碼：%s", use_unicode)
         logger.info("*** 目標語言清單：%s", ", ".join(target_languages))
+        logger.info("*** 同時請求上限：%d（RPM：%d，TPM：%d）", args.concurrency, args.rpm, args.tpm)
         logger.info("")
 
-        # 讀取並解析輸入檔案
-        lines = read_properties_file(input_file)
-        original_lines, lines_to_translate = parse_properties_lines(lines)
+        glossary = ""
+        if args.glossary:
+            glossary = pathlib.Path(args.glossary).read_text(encoding=CONFIG["file_encoding"])
+            logger.info("*** 詞彙表：%s", args.glossary)
 
-        # 對每種語言進行翻譯
-        for language in target_languages:
-            output_file = output_dir / f"{filename_prefix}_{language}.properties"
-            logger.info("--- 開始翻譯為 %s ---", language)
-
-            # 執行翻譯並寫入結果
-            translated_results = translate_properties(client, lines_to_translate, language)
-            write_output_file(
-                output_file,
-                original_lines,
-                translated_results,
-                lines_to_translate,
-                use_unicode,
+        memory = None
+        if not args.no_memory:
+            memory_path = project_root / args.memory
+            memory = TranslationMemory(
+                memory_path,
+                CONFIG["gemini_model"],
+                build_prompt_version(glossary),
+                max_entries=CONFIG["memory_max_entries"],
             )
+            logger.info("*** 翻譯記憶：%s", memory_path)
+
+        # 相同的檔案、語言、模型與 Prompt 共用同一份工作日誌
+        run_key = build_run_key(
+            sorted(bundle_names),
+            sorted(target_languages),
+            CONFIG["gemini_model"],
+            build_prompt_version(glossary),
+        )
+        journal = RunJournal(
+            project_root / CONFIG["journal_dir"] / f"i18n_props_{run_key}.jsonl",
+            run_key,
+            resume=args.resume,
+        )
+
+        translate_bundles(
+            client,
+            project_root,
+            bundle_names,
+            target_languages,
+            output_dir,
+            use_unicode=use_unicode,
+            incremental=args.incremental,
+            snapshot_dir=project_root / CONFIG["snapshot_dir"],
+            concurrency=args.concurrency,
+            limiter=AsyncRateLimiter(args.rpm, args.tpm),
+            memory=memory,
+            stream=args.stream,
+            glossary=glossary,
+            context_cache=args.context_cache,
+            journal=journal,
+        )
+        journal.complete()
+        if memory is not None:
+            memory.close()
         
         logger.info("")
         logger.info("--- 所有翻譯任務已完成 ---")
@@ -9,10 +9,18 @@
 import os
 import pathlib
 import argparse
+import asyncio
+import hashlib
+import json
 import logging
-from typing import List
+from typing import Dict, List, Tuple
 from dotenv import load_dotenv
 from google import genai
+from utils.api_retry import call_with_retry
+from utils.journal import RunJournal, atomic_write, build_run_key
+from utils.markdown import Segment, split_markdown
+from utils.rate_limit import AsyncRateLimiter
+from utils.translation_memory import text_hash
 
 # 設定日誌格式，包含時間戳記、級別和訊息
 logging.basicConfig(
@@ -32,8 +40,32 @@ CONFIG = {
     "languages": ["en", "zh-CN"],
     # 預設模型
     "gemini_model": os.environ.get("GEMINI_MODEL", "gemini-2.0-flash"),
+    # 同時進行中的 API 請求上限
+    "concurrency": 8,
+    # 每分鐘請求數上限（RPM），0 表示不限制
+    "requests_per_minute": 60,
+    # API 暫時性錯誤（429、5xx、連線錯誤）的重試次數
+    "request_retries": 5,
+    # 第一次重試前的等待秒數，之後每次加倍
+    "retry_backoff": 1.0,
+    # 每個翻譯片段的最大字元數
+    "max_chunk_chars": 4000,
+    # 片段翻譯清單（manifest）目錄，相對於輸入檔案所在目錄
+    "manifest_dir": ".i18n_cache/documents",
+    # 工作日誌目錄，相對於輸入檔案所在目錄，供 --resume 恢復中斷的工作
+    "journal_dir": ".i18n_cache/journal",
 }
 
+# 翻譯 Prompt 模板
+TRANSLATION_PROMPT = """
+    將以下文字翻譯為 {language} 語系，保留 URL 與 Markdown 格式不變。
+    根據目標語系的文化和用語規範調整描述，確保翻譯自然。
+    僅返回翻譯後的內容，不包含其他文字：
+    """
+
+# Prompt 版本，Prompt 變更時既有的片段翻譯清單即失效
+PROMPT_VERSION = hashlib.sha256(TRANSLATION_PROMPT.encode("utf-8")).hexdigest()[:12]
+
 def setup_environment() -> str:
     """設置環境變數和檔案路徑"""
     load_dotenv()
@@ -55,38 +87,238 @@ def read_input_file(file_path: pathlib.Path) -> str:
     except Exception as e:
         raise Exception(f"讀取輸入檔案時發生錯誤：{e}")
 
-def translate_content(client: genai.Client, model: str, content: str, language: str) -> str:
-    """將內容翻譯為目標語系"""
-    prompt = f"""
-    將以下文字翻譯為 {language} 語系，保留 URL 不變。
-    根據目標語系的文化和用語規範調整描述，確保翻譯自然。
-    僅返回翻譯後的內容，不包含其他文字：
+def build_generate_config() -> genai.types.GenerateContentConfig:
+    """建立翻譯請求使用的 GenerateContentConfig"""
+    return genai.types.GenerateContentConfig(
+        temperature=0.3,  # 控制輸出隨機性，0.5 為平衡值
+        # 禁用 Thinking Mode(thinking budget)為 0，表示不進行思考
+        # 並不是每個模型都有支援 thinking_config
+        thinking_config=genai.types.ThinkingConfig(thinking_budget=0)
+    )
+
+async def translate_content_async(
+    client: genai.Client, model: str, content: str, language: str
+) -> str | None:
+    """透過非同步客戶端將內容翻譯為目標語系，API 錯誤直接拋出，由呼叫端決定是否重試
+
+    回應被安全過濾等原因沒有文字時回傳 None。
     """
-    
-    try:
-        response = client.models.generate_content(
-            model=model,
-            contents=[prompt, content],
-            config=genai.types.GenerateContentConfig(
-                temperature=0.3,  # 控制輸出隨機性，0.5 為平衡值
-                # 禁用 Thinking Mode(thinking budget)為 0，表示不進行思考
-                # 並不是每個模型都有支援 thinking_config
-                thinking_config=genai.types.ThinkingConfig(thinking_budget=0)
-            ),
-        )
-        return response.text
-    except Exception as e:
-        raise Exception(f"翻譯為 {language} 時發生錯誤：{e}")
+    prompt = TRANSLATION_PROMPT.format(language=language)
+    response = await client.aio.models.generate_content(
+        model=model,
+        contents=[prompt, content],
+        config=build_generate_config(),
+    )
+    return response.text
 
 def write_output_file(content: str, output_path: pathlib.Path) -> None:
     """將翻譯內容寫入輸出檔案"""
     try:
-        with open(output_path, "w", encoding=CONFIG["file_encoding"]) as outfile:
+        with atomic_write(output_path, CONFIG["file_encoding"]) as outfile:
             outfile.write(content)
         logger.info("翻譯內容已儲存至 %s", output_path)
     except Exception as e:
         raise Exception(f"寫入輸出檔案時發生錯誤：{e}")
 
+def load_manifest(manifest_path: pathlib.Path, model: str) -> Dict[str, str]:
+    """讀取上次翻譯的片段清單 {原文雜湊: 譯文}
+
+    清單不存在、無法解析，或模型、Prompt 版本不同時回傳空字典。
+    """
+    if not manifest_path.is_file():
+        return {}
+    try:
+        with open(manifest_path, "r", encoding=CONFIG["file_encoding"]) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("無法讀取片段清單 %s，將重新翻譯：%s", manifest_path, e)
+        return {}
+    if manifest.get("model") != model or manifest.get("prompt_version") != PROMPT_VERSION:
+        return {}
+    return manifest.get("segments", {})
+
+def save_manifest(
+    manifest_path: pathlib.Path,
+    model: str,
+    segments: List[Segment],
+    translations: Dict[int, str],
+) -> None:
+    """儲存本次各可翻譯片段的原文雜湊與譯文，已不存在於文件中的片段一併移除"""
+    with atomic_write(manifest_path, CONFIG["file_encoding"]) as f:
+        json.dump(
+            {
+                "model": model,
+                "prompt_version": PROMPT_VERSION,
+                "segments": {
+                    text_hash(segments[index].text): translation
+                    for index, translation in translations.items()
+                },
+            },
+            f,
+            ensure_ascii=False,
+            indent=0,
+        )
+
+async def translate_segments_async(
+    client: genai.Client,
+    model: str,
+    segments: List[Segment],
+    languages: List[str],
+    concurrency: int = CONFIG["concurrency"],
+    limiter: AsyncRateLimiter | None = None,
+    reused: Dict[str, Dict[int, str]] | None = None,
+    journal: RunJournal | None = None,
+) -> Dict[str, Dict[int, str]]:
+    """同時翻譯所有（語言, 片段）組合
+
+    不需翻譯的片段（程式碼區塊、front matter 等）與 reused 中已有譯文的片段
+    不會送出請求。每個（語言, 片段）請求遇到 429、5xx 或連線錯誤時各自以
+    指數退避重試；重試後仍失敗時，會等其他進行中的請求完成並寫入日誌後才
+    拋出第一個錯誤，以 --resume 重新執行時只會送出失敗與未完成的片段。
+    回應沒有文字（例如被安全過濾）的片段保留原文並記錄警告，不寫入日誌，
+    下次執行時會重新翻譯。
+
+    Args:
+        reused: {語言: {片段索引: 沿用的譯文}}
+        journal: 工作日誌，每完成一個片段即寫入
+
+    Returns:
+        {語言: {片段索引: 譯文}}，不含沒有取得譯文的片段（組回文件時使用原文）
+    """
+    reused = reused or {}
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    jobs: List[Tuple[str, int]] = [
+        (language, index)
+        for language in languages
+        for index, segment in enumerate(segments)
+        if segment.translate and index not in reused.get(language, {})
+    ]
+
+    async def send(language: str, index: int) -> str | None:
+        async with semaphore:
+            if limiter:
+                await limiter.acquire()
+            return await translate_content_async(client, model, segments[index].text, language)
+
+    async def run(language: str, index: int) -> str | None:
+        try:
+            # 每次重試都重新取得 semaphore 與速率額度，退避等待期間不佔用名額
+            translated = await call_with_retry(
+                lambda: send(language, index),
+                CONFIG["request_retries"],
+                CONFIG["retry_backoff"],
+                f"[{language}] 翻譯第 {index} 個片段",
+            )
+        except Exception as e:
+            raise Exception(f"翻譯為 {language} 時發生錯誤：{e}") from e
+        if translated is None:
+            logger.warning(
+                "[%s] 第 %d 個片段沒有取得譯文（回應可能被安全過濾），保留原文：%.40s",
+                language,
+                index,
+                segments[index].text,
+            )
+            return None
+        # 片段前後的換行已拆為保留片段，去除模型多加的換行以維持原本版面
+        translated = translated.strip("\r\n")
+        if journal is not None:
+            journal.append(
+                {
+                    "language": language,
+                    "hash": text_hash(segments[index].text),
+                    "translation": translated,
+                }
+            )
+        return translated
+
+    translatable = sum(1 for segment in segments if segment.translate)
+    logger.info(
+        "共 %d 個片段，其中 %d 個需要翻譯，語言數 %d，本次送出 %d 個請求",
+        len(segments),
+        translatable,
+        len(languages),
+        len(jobs),
+    )
+    results = await asyncio.gather(*(run(*job) for job in jobs), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    translations = {language: dict(reused.get(language, {})) for language in languages}
+    for (language, index), translated in zip(jobs, results):
+        if translated is not None:
+            translations[language][index] = translated
+    return translations
+
+def assemble_document(segments: List[Segment], translations: Dict[int, str]) -> str:
+    """依原順序組回文件，保留片段使用原文"""
+    return "".join(
+        translations.get(index, segment.text) for index, segment in enumerate(segments)
+    )
+
+def translate_document(
+    client: genai.Client,
+    model: str,
+    input_path: pathlib.Path,
+    languages: List[str],
+    concurrency: int = CONFIG["concurrency"],
+    limiter: AsyncRateLimiter | None = None,
+    max_chunk_chars: int = CONFIG["max_chunk_chars"],
+    incremental: bool = True,
+    journal: RunJournal | None = None,
+) -> None:
+    """將輸入檔案翻譯為各目標語系，輸出為同目錄下的 {stem}_{lang}{suffix}
+
+    文件依 Markdown 結構切分為片段，所有語言的片段同時送出翻譯後再依序組回。
+    每個輸出檔案另有一份片段清單記錄各片段原文雜湊與譯文；incremental 為 True 時，
+    原文未變更的片段直接沿用清單中的譯文，只翻譯新增或修改的片段。
+    工作日誌中已完成的片段（上次中斷前的結果）同樣不再送出翻譯。
+    """
+    # 讀取輸入檔案並切分片段
+    content = read_input_file(input_path)
+    segments = split_markdown(content, max_chunk_chars)
+    manifest_dir = input_path.parent / CONFIG["manifest_dir"]
+
+    output_paths: Dict[str, pathlib.Path] = {}
+    manifest_paths: Dict[str, pathlib.Path] = {}
+    reused: Dict[str, Dict[int, str]] = {}
+    journaled: Dict[Tuple[str, str], str] = {}
+    if journal is not None:
+        journaled = {
+            (record["language"], record["hash"]): record["translation"]
+            for record in journal.records
+        }
+    for lang in languages:
+        # 生成輸出檔案名稱
+        output_name = f"{input_path.stem}_{lang}{input_path.suffix}"
+        output_paths[lang] = input_path.parent / output_name
+        manifest_paths[lang] = manifest_dir / f"{output_name}.json"
+        previous = load_manifest(manifest_paths[lang], model) if incremental else {}
+        previous.update(
+            (digest, translation)
+            for (language, digest), translation in journaled.items()
+            if language == lang
+        )
+        reused[lang] = {
+            index: previous[digest]
+            for index, segment in enumerate(segments)
+            if segment.translate and (digest := text_hash(segment.text)) in previous
+        }
+        if reused[lang]:
+            logger.info("%s：沿用 %d 個未變更片段的譯文", output_name, len(reused[lang]))
+
+    logger.info("--- 開始翻譯為 %s ---", ", ".join(languages))
+    results = asyncio.run(
+        translate_segments_async(
+            client, model, segments, languages, concurrency, limiter, reused, journal
+        )
+    )
+
+    for lang in languages:
+        # 寫入翻譯結果與片段清單
+        write_output_file(assemble_document(segments, results[lang]), output_paths[lang])
+        save_manifest(manifest_paths[lang], model, segments, results[lang])
+
 def parse_arguments() -> argparse.Namespace:
     """解析命令列參數"""
     parser = argparse.ArgumentParser(
@@ -103,6 +335,34 @@ def parse_arguments() -> argparse.Namespace:
         default=",".join(CONFIG["languages"]),
         help="以逗號分隔的目標語言清單，例如：en,zh-CN（預設：en,zh-CN）",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=CONFIG["concurrency"],
+        help=f"同時進行的 API 請求數上限（預設：{CONFIG['concurrency']}）",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        default=CONFIG["requests_per_minute"],
+        help=f"每分鐘請求數上限，0 表示不限制（預設：{CONFIG['requests_per_minute']}）",
+    )
+    parser.add_argument(
+        "--max-chunk-chars",
+        type=int,
+        default=CONFIG["max_chunk_chars"],
+        help=f"每個翻譯片段的最大字元數（預設：{CONFIG['max_chunk_chars']}）",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="忽略片段清單，重新翻譯所有片段",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="重播上次中斷工作的日誌，只送出尚未完成的片段",
+    )
     return parser.parse_args()
 
 def main():
@@ -120,9 +380,6 @@ def main():
         if not input_path.is_file():
             raise FileNotFoundError(f"輸入檔案不存在：{input_path}")
         
-        # 輸出檔案將生成在輸入檔案的同一目錄下
-        input_dir = input_path.parent
-        
         logger.info("*** 輸入檔案：%s", input_path)
         logger.info("*** 使用模型：%s", CONFIG["gemini_model"])
         logger.info("*** 輸出檔案編碼：%s", CONFIG["file_encoding"])
@@ -132,22 +389,29 @@ def main():
         # 初始化 Gemini 客戶端
         client = genai.Client(api_key=google_api_key)
         
-        # 讀取輸入檔案
-        content = read_input_file(input_path)
-        
-        # 處理翻譯
-        for lang in target_languages:
-            logger.info("--- 開始翻譯為 %s ---", lang) 
-            
-            # 執行翻譯
-            translated_content = translate_content(client, CONFIG["gemini_model"], content, lang)
-            
-            # 生成輸出檔案名稱
-            output_filename = f"{input_path.stem}_{lang}{input_path.suffix}"
-            output_path = input_dir / output_filename
-            
-            # 寫入翻譯結果
-            write_output_file(translated_content, output_path)
+        # 相同的輸入檔、語言與模型共用同一份工作日誌
+        run_key = build_run_key(
+            str(input_path), sorted(target_languages), CONFIG["gemini_model"], PROMPT_VERSION
+        )
+        journal = RunJournal(
+            input_path.parent / CONFIG["journal_dir"] / f"{input_path.name}_{run_key}.jsonl",
+            run_key,
+            resume=args.resume,
+        )
+
+        # 處理翻譯，輸出檔案將生成在輸入檔案的同一目錄下
+        translate_document(
+            client,
+            CONFIG["gemini_model"],
+            input_path,
+            target_languages,
+            concurrency=args.concurrency,
+            limiter=AsyncRateLimiter(args.rpm),
+            max_chunk_chars=args.max_chunk_chars,
+            incremental=not args.full,
+            journal=journal,
+        )
+        journal.complete()
             
         logger.info("")
         logger.info("--- 所有翻譯任務已完成 ---")
@@ -1,11 +1,29 @@
 from __future__ import annotations
 import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
 import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Any, Iterator
 
 import pymupdf as pymupdf  # PyMuPDF
 import pymupdf4llm
 
+from utils.journal import atomic_write
+
+# 批次模式的轉換紀錄檔名（位於輸出目錄），記錄各 PDF 的雜湊與轉換選項
+BATCH_MANIFEST_NAME = ".pdf_to_markdown.manifest.json"
+
+# pymupdf4llm 輸出的圖片引用：![](path)
+_IMAGE_REF_PATTERN = re.compile(r"!\[\]\(([^)]+)\)")
+
 
 def parse_pages_spec(spec: str, page_count: int) -> list[int]:
     """解析 1-based 頁範圍字串為 0-based 整數清單。
@@ -40,6 +58,11 @@ def parse_pages_spec(spec: str, page_count: int) -> list[int]:
     return sorted(pages)
 
 
+def format_page_section(number: int, text: str) -> str:
+    """產生單頁的 Markdown 段落，前面加上頁界線註解：<!-- page: N -->。"""
+    return f"\n\n<!-- page: {number} -->\n\n{text}"
+
+
 def build_markdown_from_chunks(chunks: list[dict]) -> str:
     """將 page_chunks 的 list[dict] 合併為單一 Markdown 字串。
     每頁前加上頁界線註解：<!-- page: N -->（N 以 1 開始）。
@@ -47,28 +70,134 @@ def build_markdown_from_chunks(chunks: list[dict]) -> str:
     parts: list[str] = []
     for i, page in enumerate(chunks, start=1):
         text = page.get("text", "") or ""
-        parts.append(f"\n\n<!-- page: {i} -->\n\n{text}")
+        parts.append(format_page_section(i, text))
     return "".join(parts)
 
 
+def split_shards(pages: list[int], workers: int, shards_per_worker: int = 4) -> list[list[int]]:
+    """將頁碼清單依序切分為連續的分片。
+    分片數為 workers 的數倍，讓頁面複雜度不均時各行程的負載仍較平均。
+    參數：
+      - pages: 0-based 頁碼清單
+      - workers: 行程數
+      - shards_per_worker: 每個行程平均分到的分片數
+    回傳：依原順序排列的分片清單
+    """
+    if not pages:
+        return []
+    shard_count = min(len(pages), max(workers, 1) * shards_per_worker)
+    size = -(-len(pages) // shard_count)
+    return [pages[i : i + size] for i in range(0, len(pages), size)]
+
+
+def store_images(text: str, render_dir: str, image_dir: str) -> str:
+    """將 Markdown 引用的圖片以內容雜湊命名並移入共用的圖片目錄，內容相同的圖片只保留一份。
+    圖片由 render_dir 以 rename 移至 image_dir/<SHA-256 前 32 碼>.<副檔名>；同名檔案已存在時
+    （相同內容，可能來自其他頁或其他文件）刪除新寫出的檔案，並將 Markdown 中的引用改為共用檔案。
+    參數：
+      - text: 含 ![](path) 圖片引用的 Markdown
+      - render_dir: 本次轉換寫出圖片的目錄，只處理此目錄下的圖片
+      - image_dir: 共用的圖片目錄，須與 render_dir 位於同一檔案系統
+    回傳：更新引用後的 Markdown
+    """
+    root = Path(render_dir).resolve()
+    renamed: dict[str, str] = {}
+
+    def replace(match: re.Match[str]) -> str:
+        ref = match.group(1)
+        if ref not in renamed:
+            path = Path(ref)
+            if path.resolve().parent != root or not path.is_file():
+                return match.group(0)
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()[:32]
+            target = Path(image_dir) / f"{digest}{path.suffix}"
+            if target.exists():
+                path.unlink()
+            else:
+                # 同時寫入同一雜湊的其他行程內容必然相同，rename 為原子操作，誰覆蓋誰都無妨
+                os.replace(path, target)
+            renamed[ref] = str(target).replace("\\", "/")
+        return f"![]({renamed[ref]})"
+
+    return _IMAGE_REF_PATTERN.sub(replace, text)
+
+
+def _run_to_markdown(
+    doc: pymupdf.Document,
+    pages: list[int] | None,
+    options: dict[str, Any],
+    show_progress: bool = False,
+) -> list[dict] | str:
+    """呼叫 pymupdf4llm.to_markdown；options 中的 dedup_images 啟用時以內容雜湊保存圖片。
+    pymupdf4llm 以「原始檔名-頁碼-序號」命名圖片，多份文件（例如不同子目錄中的同名 PDF）
+    共用圖片目錄時會互相覆蓋，因此先渲染至本次轉換專用的暫存目錄，再依雜湊移入共用目錄。
+    """
+    kwargs = dict(options)
+    dedup_images = kwargs.pop("dedup_images", False)
+    if not (dedup_images and kwargs.get("write_images")):
+        return pymupdf4llm.to_markdown(doc, pages=pages, show_progress=show_progress, **kwargs)
+    image_dir = kwargs["image_path"]
+    # 暫存目錄建在圖片目錄下，確保與共用目錄位於同一檔案系統
+    render_dir = tempfile.mkdtemp(dir=image_dir, prefix=".render-")
+    kwargs["image_path"] = render_dir
+    try:
+        result = pymupdf4llm.to_markdown(doc, pages=pages, show_progress=show_progress, **kwargs)
+        if isinstance(result, str):
+            return store_images(result, render_dir, image_dir)
+        for chunk in result:
+            chunk["text"] = store_images(chunk.get("text", "") or "", render_dir, image_dir)
+        return result
+    finally:
+        shutil.rmtree(render_dir, ignore_errors=True)
+
+
+def _convert_shard(input_path: str, pages: list[int], options: dict[str, Any]) -> list[dict] | str:
+    """子行程工作：自行開啟 PDF 並轉換指定頁面。
+    page_chunks 啟用時只回傳各頁的 metadata 與 text，避免傳回大量表格、圖片座標資料。
+    """
+    with pymupdf.open(input_path) as doc:
+        result = _run_to_markdown(doc, pages, options)
+    if isinstance(result, str):
+        return result
+    return [{"metadata": chunk.get("metadata", {}), "text": chunk.get("text", "")} for chunk in result]
+
+
 def pdf_to_markdown(
     input_path: str,
     output_path: str,
     *,
     pages: list[int] | None = None,
+    pages_spec: str | None = None,
     image_dir: str | None = None,
     table_strategy: str = "lines_strict",
     use_toc: bool = True,
     page_chunks: bool = True,
     show_progress: bool = True,
     write_images: bool = True,
+    workers: int = 1,
+    stream: bool = False,
+    window: int = 8,
+    resume: bool = False,
+    dedup_images: bool = False,
+    dpi: int = 150,
+    timings: dict[str, float] | None = None,
 ) -> None:
     """讀取 PDF 並輸出 Markdown。
     - 以 TOC 判定標題層級（use_toc）
     - 圖片輸出為檔案（write_images + image_dir）
-    - 可選頁範圍（pages 為 0-based；None=全部）
+    - 可選頁範圍（pages 為 0-based；None=全部），或以 pages_spec（1-based 字串）
+      指定，於開啟 PDF 後解析，不需為了取得頁數另外開啟一次
     - 可啟用每頁分塊（page_chunks）與進度列（show_progress）
     - 表格策略（table_strategy）可調整
+    - workers > 1 時將頁面切分為分片，由多個行程各自開啟 PDF 平行轉換後依序合併；
+      圖片檔名由原始檔名與頁碼組成，與單一行程轉換時相同
+    - stream 啟用時每次只轉換 window 頁，各頁段落產生後立即附加至輸出檔，
+      記憶體用量與文件長度無關；搭配 resume 可從檢查點記錄的最後寫出頁接續轉換
+    - dedup_images 啟用時圖片以內容雜湊命名，
+      相同內容只寫入一份（image_dir 相同的多份文件之間也共用）
+    - dpi 為圖片渲染解析度
+    - 提供 timings 時，會記錄各階段耗時（秒）：open、headers、convert、write；
+      串流模式的轉換與寫入交錯進行，一律計入 convert
     """
     in_path = Path(input_path)
     out_path = Path(output_path)
@@ -76,9 +205,21 @@ def pdf_to_markdown(
         raise FileNotFoundError(f"找不到輸入檔：{in_path}")
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
+    timings = timings if timings is not None else {}
+    started = time.perf_counter()
     doc = pymupdf.open(str(in_path))
     try:
+        if pages_spec:
+            pages = parse_pages_spec(pages_spec, len(doc))
+        timings["open"] = time.perf_counter() - started
+
+        started = time.perf_counter()
         hdr_info = pymupdf4llm.TocHeaders(doc) if use_toc else None
+        if hdr_info is None and (workers > 1 or stream):
+            # 未使用 TOC 時標題層級依全文字級統計，先在此計算一次，
+            # 避免各分片、各視窗重複統計或結果不一致
+            hdr_info = pymupdf4llm.IdentifyHeaders(doc)
+        timings["headers"] = time.perf_counter() - started
 
         final_image_dir: Path | None = None
         if write_images:
@@ -87,42 +228,314 @@ def pdf_to_markdown(
 
         ts = None if table_strategy.lower() in {"none", "off", "disable"} else table_strategy
 
-        md_or_chunks = pymupdf4llm.to_markdown(
-            doc,
-            pages=pages,
+        options: dict[str, Any] = dict(
             hdr_info=hdr_info,
             write_images=bool(write_images),
             embed_images=False,
             ignore_images=False,
             ignore_graphics=False,
-            dpi=150,
+            dpi=dpi,
             image_path=str(final_image_dir) if final_image_dir else "",
             image_format="png",
             force_text=True,
             margins=0,
             page_chunks=bool(page_chunks),
             table_strategy=ts,
-            show_progress=bool(show_progress),
+            dedup_images=bool(dedup_images),
         )
 
+        started = time.perf_counter()
+        if stream:
+            options["page_chunks"] = True
+            page_list = pages if pages is not None else list(range(len(doc)))
+            _stream_pages(doc, in_path, out_path, page_list, options, workers, window, resume, show_progress)
+            timings["convert"] = time.perf_counter() - started
+            return
+
+        if workers > 1:
+            shards = split_shards(pages if pages is not None else list(range(len(doc))), workers)
+            md_or_chunks = _convert_shards(str(in_path), shards, options, workers, show_progress)
+        else:
+            md_or_chunks = _run_to_markdown(doc, pages, options, bool(show_progress))
+        timings["convert"] = time.perf_counter() - started
+
+        started = time.perf_counter()
         md_text = build_markdown_from_chunks(md_or_chunks) if page_chunks else str(md_or_chunks)
         out_path.write_bytes(md_text.encode("utf-8"))
+        timings["write"] = time.perf_counter() - started
     finally:
         doc.close()
 
 
+def _convert_shards(
+    input_path: str,
+    shards: list[list[int]],
+    options: dict[str, Any],
+    workers: int,
+    show_progress: bool,
+) -> list[dict] | str:
+    """以行程池平行轉換各分片，並依分片順序合併結果。"""
+    chunks: list[dict] = []
+    texts: list[str] = []
+    total = sum(len(shard) for shard in shards)
+    done = 0
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards)) or 1) as executor:
+        results = executor.map(
+            _convert_shard,
+            [input_path] * len(shards),
+            shards,
+            [options] * len(shards),
+        )
+        # executor.map 依提交順序回傳，合併後的頁序與單一行程轉換相同
+        for shard, result in zip(shards, results):
+            if isinstance(result, str):
+                texts.append(result)
+            else:
+                chunks.extend(result)
+            done += len(shard)
+            if show_progress:
+                print(f"已完成 {done}/{total} 頁", file=sys.stderr)
+    return chunks if options["page_chunks"] else "".join(texts)
+
+
+def _checkpoint_path(out_path: Path) -> Path:
+    """串流模式的檢查點檔案路徑：<輸出檔名>.progress.json。"""
+    return out_path.with_name(out_path.name + ".progress.json")
+
+
+def _stream_signature(in_path: Path, page_list: list[int], options: dict[str, Any]) -> str:
+    """計算輸入檔、頁碼與轉換選項的識別碼，任一項變更時檢查點即失效。"""
+    stat = in_path.stat()
+    payload = json.dumps(
+        {
+            "input": str(in_path.resolve()),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "pages": page_list,
+            "options": {k: v for k, v in options.items() if k != "hdr_info"},
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _iter_windows(
+    doc: pymupdf.Document,
+    input_path: str,
+    windows: list[list[int]],
+    options: dict[str, Any],
+    workers: int,
+) -> Iterator[list[dict]]:
+    """依序產生各視窗的 page chunks；workers > 1 時每次平行轉換 workers 個視窗。"""
+    if workers <= 1:
+        for window_pages in windows:
+            yield _run_to_markdown(doc, window_pages, options)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for start in range(0, len(windows), workers):
+            group = windows[start : start + workers]
+            yield from executor.map(
+                _convert_shard, [input_path] * len(group), group, [options] * len(group)
+            )
+
+
+def _stream_pages(
+    doc: pymupdf.Document,
+    in_path: Path,
+    out_path: Path,
+    page_list: list[int],
+    options: dict[str, Any],
+    workers: int,
+    window: int,
+    resume: bool,
+    show_progress: bool,
+) -> None:
+    """逐視窗轉換並附加寫入輸出檔，每個視窗寫完即更新檢查點。
+    檢查點記錄已寫出的頁數與輸出檔大小；接續時先將輸出檔截斷至該大小，
+    捨棄中斷前寫到一半的內容，再從下一頁開始轉換。
+    """
+    checkpoint = _checkpoint_path(out_path)
+    signature = _stream_signature(in_path, page_list, options)
+    written = 0
+    size = 0
+    if resume and checkpoint.is_file() and out_path.is_file():
+        state = json.loads(checkpoint.read_text(encoding="utf-8"))
+        if state.get("signature") == signature:
+            written, size = state["written"], state["size"]
+            print(f"從第 {written + 1} 頁接續轉換", file=sys.stderr)
+        else:
+            print("檢查點與目前的輸入或選項不符，重新轉換", file=sys.stderr)
+
+    window = max(window, 1)
+    windows = [page_list[i : i + window] for i in range(written, len(page_list), window)]
+    with open(out_path, "r+b" if size else "wb") as f:
+        f.truncate(size)
+        f.seek(size)
+        for chunks in _iter_windows(doc, str(in_path), windows, options, workers):
+            for chunk in chunks:
+                written += 1
+                f.write(format_page_section(written, chunk.get("text", "") or "").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            with atomic_write(checkpoint) as cp:
+                json.dump({"signature": signature, "written": written, "size": f.tell()}, cp)
+            if show_progress:
+                print(f"已寫出 {written}/{len(page_list)} 頁", file=sys.stderr)
+    checkpoint.unlink(missing_ok=True)
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """串流計算檔案內容的 SHA-256。"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_batch_input(spec: str) -> bool:
+    """輸入為目錄或含萬用字元（*、?、[）時視為批次模式。
+    實際存在的檔案優先視為單一檔案，檔名含萬用字元（例如 report[2024].pdf）時也不會被當成樣式展開。
+    """
+    path = Path(spec)
+    if path.is_file():
+        return False
+    return path.is_dir() or any(ch in spec for ch in "*?[")
+
+
+def collect_pdf_files(spec: str) -> tuple[Path, list[Path]]:
+    """列出批次模式要轉換的 PDF。
+    參數：
+      - spec: 目錄（遞迴搜尋 *.pdf）或 glob 樣式（支援 **）
+    回傳：(基準目錄, 已排序的 PDF 路徑清單)；輸出檔會依相對於基準目錄的路徑配置
+    """
+    path = Path(spec)
+    if path.is_dir():
+        files = [p for p in path.rglob("*") if p.suffix.lower() == ".pdf" and p.is_file()]
+        return path, sorted(files)
+    files = [Path(p) for p in glob.glob(spec, recursive=True) if p.lower().endswith(".pdf")]
+    files = sorted(p for p in files if p.is_file())
+    base = Path(os.path.commonpath([str(p.parent.resolve()) for p in files])) if files else Path(".")
+    return base, [p.resolve() for p in files]
+
+
+def _convert_batch_file(input_path: str, output_path: str, options: dict[str, Any]) -> str | None:
+    """子行程工作：轉換單一 PDF，失敗時回傳錯誤訊息而不中斷整批。"""
+    try:
+        pdf_to_markdown(input_path, output_path, show_progress=False, workers=1, **options)
+        return None
+    except Exception as e:
+        return str(e)
+
+
+def convert_batch(
+    input_spec: str,
+    output_dir: str,
+    options: dict[str, Any],
+    *,
+    workers: int = 1,
+    force: bool = False,
+) -> tuple[int, int, int]:
+    """批次轉換目錄或 glob 樣式下的所有 PDF。
+    輸出目錄中的轉換紀錄以「檔案內容雜湊 + 轉換選項」判斷是否需重新轉換；
+    檔案大小與修改時間未變時直接沿用紀錄中的雜湊，不需重新讀取檔案。
+    參數：
+      - input_spec: 輸入目錄或 glob 樣式
+      - output_dir: 輸出目錄，各 PDF 輸出為相對路徑相同、副檔名為 .md 的檔案
+      - options: 傳給 pdf_to_markdown 的轉換選項
+      - workers: 同時轉換的檔案數（行程數）
+      - force: 忽略轉換紀錄，全部重新轉換
+    回傳：(轉換成功數, 略過數, 失敗數)
+    """
+    base, files = collect_pdf_files(input_spec)
+    if not files:
+        raise FileNotFoundError(f"找不到符合的 PDF：{input_spec}")
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if options.get("dedup_images") and not options.get("image_dir"):
+        # 以內容雜湊保存圖片時，所有文件共用輸出目錄下的 images，跨文件的相同圖片只保存一份
+        options = {**options, "image_dir": str(out_dir / "images")}
+    manifest_path = out_dir / BATCH_MANIFEST_NAME
+    manifest: dict[str, dict[str, Any]] = {}
+    if manifest_path.is_file():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    # resume 只影響轉換中斷後的接續方式，不影響輸出內容
+    key_options = {k: v for k, v in options.items() if k != "resume"}
+    options_key = hashlib.sha256(json.dumps(key_options, sort_keys=True).encode("utf-8")).hexdigest()
+
+    pending: dict[str, tuple[Path, Path, dict[str, Any]]] = {}
+    skipped = 0
+    for pdf in files:
+        rel = pdf.resolve().relative_to(base.resolve()).as_posix()
+        out_path = out_dir / Path(rel).with_suffix(".md")
+        stat = pdf.stat()
+        entry = manifest.get(rel, {})
+        if entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime_ns:
+            sha256 = entry["sha256"]
+        else:
+            sha256 = file_sha256(pdf)
+        record = {"sha256": sha256, "size": stat.st_size, "mtime": stat.st_mtime_ns, "options": options_key}
+        if not force and out_path.is_file() and entry.get("sha256") == sha256 and entry.get("options") == options_key:
+            manifest[rel] = record
+            skipped += 1
+            continue
+        pending[rel] = (pdf, out_path, record)
+
+    print(f"共 {len(files)} 個 PDF，略過未變更 {skipped} 個，需轉換 {len(pending)} 個", file=sys.stderr)
+    converted = 0
+    failed = 0
+    try:
+        with ProcessPoolExecutor(max_workers=max(workers, 1)) as executor:
+            futures = {
+                executor.submit(_convert_batch_file, str(pdf), str(out_path), options): rel
+                for rel, (pdf, out_path, _) in pending.items()
+            }
+            for future in as_completed(futures):
+                rel = futures[future]
+                error = future.result()
+                if error is None:
+                    converted += 1
+                    manifest[rel] = pending[rel][2]
+                    print(f"[{converted + failed}/{len(pending)}] 已轉換 {rel}", file=sys.stderr)
+                else:
+                    failed += 1
+                    manifest.pop(rel, None)
+                    print(f"[{converted + failed}/{len(pending)}] 轉換失敗 {rel}：{error}", file=sys.stderr)
+    finally:
+        # 中斷時已完成的檔案仍寫入紀錄，下次執行不會重新轉換
+        with atomic_write(manifest_path) as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=0, sort_keys=True)
+    return converted, skipped, failed
+
+
 def _build_arg_parser() -> argparse.ArgumentParser:
     """建立命令列參數解析器。"""
     p = argparse.ArgumentParser(description="PDF → Markdown 轉換（PyMuPDF4LLM）")
-    p.add_argument("-i", "--input", required=True, help="輸入 PDF 檔路徑")
-    p.add_argument("-o", "--output", required=True, help="輸出 Markdown 檔路徑")
+    p.add_argument("-i", "--input", required=True, help="輸入 PDF 檔路徑；目錄或 glob 樣式（如 \"docs/**/*.pdf\"）則為批次模式")
+    p.add_argument("-o", "--output", required=True, help="輸出 Markdown 檔路徑；批次模式下為輸出目錄")
     p.add_argument("--pages", help="頁範圍（1-based），如: 1-5,8,10-12；未提供則處理全部")
     p.add_argument("--write-images", action="store_true", default=True, help="輸出圖片檔（預設開啟）")
     p.add_argument("--image-dir", help="圖片輸出目錄，預設為輸出檔同層 images 子目錄")
     p.add_argument("--use-toc", action="store_true", default=True, help="使用 TOC 判定標題層級（預設開啟）")
+    p.add_argument("--dpi", type=int, default=150, help="圖片渲染解析度（預設 150）")
     p.add_argument("--table-strategy", default="lines_strict", choices=["lines_strict", "lines", "none"], help="表格偵測策略")
     p.add_argument("--page-chunks", action="store_true", default=True, help="每頁分塊輸出（預設開啟）")
     p.add_argument("--show-progress", action="store_true", default=True, help="顯示處理進度（預設開啟）")
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="平行轉換的行程數，0 表示使用全部 CPU 核心（預設 1，不啟用平行處理）；批次模式下為同時轉換的檔案數",
+    )
+    p.add_argument("--stream", action="store_true", help="逐頁串流寫出輸出檔，記憶體用量不隨頁數成長")
+    p.add_argument("--window", type=int, default=8, help="串流模式每次轉換的頁數（預設 8）")
+    p.add_argument("--resume", action="store_true", help="串流模式下從檢查點記錄的最後寫出頁接續轉換")
+    p.add_argument(
+        "--dedup-images",
+        action="store_true",
+        help="圖片以內容雜湊命名，相同圖片只保存一份（批次模式下跨文件共用）",
+    )
+    p.add_argument("--force", action="store_true", help="批次模式下忽略轉換紀錄，全部重新轉換")
     return p
 
 
@@ -133,22 +546,34 @@ def main(argv: list[str] | None = None) -> int:
     args = parser.parse_args(argv)
 
     in_path = Path(args.input)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    options: dict[str, Any] = dict(
+        pages_spec=args.pages,
+        image_dir=args.image_dir,
+        table_strategy=args.table_strategy,
+        use_toc=bool(args.use_toc),
+        page_chunks=bool(args.page_chunks),
+        write_images=bool(args.write_images),
+        stream=bool(args.stream),
+        window=args.window,
+        resume=bool(args.resume),
+        dedup_images=bool(args.dedup_images),
+        dpi=args.dpi,
+    )
     try:
-        with pymupdf.open(str(in_path)) as tmp_doc:
-            pages_0: list[int] | None = None
-            if args.pages:
-                pages_0 = parse_pages_spec(args.pages, len(tmp_doc))
+        if is_batch_input(args.input):
+            converted, skipped, failed = convert_batch(
+                args.input, args.output, options, workers=workers, force=bool(args.force)
+            )
+            print(f"批次轉換完成：成功 {converted}、略過 {skipped}、失敗 {failed}")
+            return 1 if failed else 0
 
         pdf_to_markdown(
             input_path=str(in_path),
             output_path=args.output,
-            pages=pages_0,
-            image_dir=args.image_dir,
-            table_strategy=args.table_strategy,
-            use_toc=bool(args.use_toc),
-            page_chunks=bool(args.page_chunks),
             show_progress=bool(args.show_progress),
-            write_images=bool(args.write_images),
+            workers=workers,
+            **options,
         )
         print(f"已將 {in_path} 轉換為 {args.output}")
         return 0
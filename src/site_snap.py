@@ -1,21 +1,85 @@
-import requests
-from bs4 import BeautifulSoup
-import os
-from urllib.parse import urljoin, urlparse
+# /// script
+# requires-python = ">=3.13"
+# dependencies = [
+#     "httpx",
+#     "beautifulsoup4",
+# ]
+# ///
+"""網站快照工具
+
+從起始 URL 開始以非同步方式爬取同一路徑下的所有頁面，直接串流寫入 ZIP 快照。
+
+爬蟲以工作佇列（frontier）取代遞迴，由固定數量的 worker 共用同一個
+連線池（keep-alive）的 HTTP 客戶端；可限制全域與每個主機的同時請求數、
+同一主機兩次請求的最小間隔，並對連線錯誤、429 與 5xx 回應以指數退避重試。
+URL 會先正規化再去除重複，各 URL 的爬取狀態保存在 SQLite，中斷後可接續爬取。
+增量模式會以上次記錄的 ETag / Last-Modified 送出條件式請求，
+回應 304 的頁面直接沿用上一個 ZIP 中的內容。
+頁面以原始回應內容儲存，連結以標準函式庫的串流式 HTMLParser 擷取，
+不建立完整的文件樹；需要排版整齊的 HTML 時可加上 --prettify。
+頁面由單一寫入者在背景執行緒中依序壓縮寫入 ZIP，壓縮與網路等待重疊進行，
+不再先寫入資料夾再整批壓縮。
+"""
+
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import pathlib
+import time
 import zipfile
 from datetime import datetime
+from html.parser import HTMLParser
+from urllib.parse import urldefrag, urljoin, urlparse
+
+import httpx
+from bs4 import BeautifulSoup
+
+from utils.crawl_frontier import (
+    DONE,
+    FAILED,
+    CrawlFrontier,
+    PageRecord,
+    canonicalize_url,
+    is_within_scope,
+)
+
+# 設定參數
+CONFIG = {
+    # 起始 URL，只爬取以此為前綴的頁面
+    "base_url": "https://deepwiki.com/vancetang/demo/",
+    # 快照名稱前綴，ZIP 檔名為 <output_dir>_<時間戳記>.zip
+    "output_dir": "deepwiki_pages",
+    # 全域同時請求數上限（亦為連線池大小）
+    "concurrency": 16,
+    # 每個主機的同時請求數上限
+    "per_host_concurrency": 4,
+    # 同一主機兩次請求之間的最小間隔（秒）
+    "delay": 0.1,
+    # 失敗時的重試次數
+    "retries": 3,
+    # 第一次重試前的等待秒數，之後每次加倍
+    "backoff": 0.5,
+    # 單一請求的逾時秒數
+    "timeout": 10,
+    # 爬取狀態資料庫路徑，{output_dir} 會替換為快照名稱前綴
+    "state_path": "{output_dir}.crawl.sqlite3",
+    # ZIP 壓縮等級（deflate 為 0-9）
+    "compress_level": 6,
+    # 等待寫入 ZIP 的頁面數上限，超過時 worker 暫停等待寫入
+    "write_queue_size": 64,
+}
 
-# 設置目標 URL
-base_url = "https://deepwiki.com/vancetang/demo/"
-output_dir = "deepwiki_pages"
-zip_filename = f"deepwiki_pages_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+# 需要重試的 HTTP 狀態碼
+RETRY_STATUS = {429, 500, 502, 503, 504}
 
-# 創建儲存 HTML 的資料夾
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
+# ZIP 中記錄重複頁面（檔名 → 實際儲存的檔名）的檔案
+DUPLICATES_NAME = "_duplicates.json"
+
+# --compression 選項對應的 zipfile 壓縮方式
+COMPRESSION_METHODS = {"deflate": zipfile.ZIP_DEFLATED, "store": zipfile.ZIP_STORED}
 
-# 儲存已訪問的 URL 以避免重複
-visited_urls = set()
 
 def sanitize_filename(url):
     """將 URL 轉換為安全的檔案名稱"""
@@ -25,64 +89,503 @@ def sanitize_filename(url):
         path = "index"
     return f"{path}.html"
 
-def save_page(url, content):
-    """儲存網頁內容為 HTML 檔案"""
-    filename = sanitize_filename(url)
-    filepath = os.path.join(output_dir, filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(content)
-    print(f"Saved: {filepath}")
-
-def crawl_page(url):
-    """爬取網頁並儲存，遞迴爬取所有連結"""
-    if url in visited_urls or not url.startswith(base_url):
-        return
-    
-    visited_urls.add(url)
-    print(f"Crawling: {url}")
-    
-    try:
-        # 發送請求
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        # 儲存當前頁面
-        save_page(url, str(soup.prettify()))
-        
-        # 尋找所有連結
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
-            absolute_url = urljoin(base_url, href)
-            
-            # 只爬取同一域名下的連結
-            if absolute_url.startswith(base_url):
-                crawl_page(absolute_url)
-                
-    except requests.RequestException as e:
-        print(f"Error crawling {url}: {e}")
-
-def create_zip():
-    """將所有 HTML 檔案壓縮為 ZIP"""
-    with zipfile.ZipFile(zip_filename, "w", zipfile.ZIP_DEFLATED) as zf:
-        for root, _, files in os.walk(output_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                zf.write(file_path, os.path.relpath(file_path, output_dir))
-    print(f"Created ZIP: {zip_filename}")
+
+def read_snapshot_index(zf: zipfile.ZipFile) -> dict[str, str]:
+    """讀取快照中所有頁面檔名與實際儲存檔名的對應（含以 dedup 省略的重複頁面）"""
+    index = {name: name for name in zf.namelist() if name != DUPLICATES_NAME}
+    if DUPLICATES_NAME in zf.namelist():
+        index.update(json.loads(zf.read(DUPLICATES_NAME)))
+    return index
+
+
+class SnapshotWriter:
+    """將頁面串流寫入 ZIP 的單一寫入者
+
+    worker 以 put() 將頁面放入有上限的佇列，由單一背景工作在執行緒中壓縮並寫入，
+    ZIP 不會被同時寫入。啟用 dedup 時內容相同的頁面只儲存一次，
+    其餘檔名記錄在 DUPLICATES_NAME 中。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        compression: int = zipfile.ZIP_DEFLATED,
+        compresslevel: int | None = CONFIG["compress_level"],
+        dedup: bool = False,
+        queue_size: int = CONFIG["write_queue_size"],
+    ) -> None:
+        self.path = path
+        self.dedup = dedup
+        self.written = 0
+        self.duplicates = 0
+        # 重複頁面檔名 → 實際儲存的檔名
+        self.aliases: dict[str, str] = {}
+        self._zip = zipfile.ZipFile(path, "w", compression, compresslevel=compresslevel)
+        self._names: set[str] = set()
+        self._hashes: dict[str, str] = {}
+        self._queue: asyncio.Queue[tuple[str, bytes] | None] = asyncio.Queue(maxsize=queue_size)
+        self._task: asyncio.Task | None = None
+        self._error: BaseException | None = None
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._names
+
+    def _write(self, filename: str, content: bytes) -> None:
+        if filename in self._names:
+            # 不同 URL 轉換為相同檔名時保留先寫入的頁面
+            print(f"Skipped duplicate filename: {filename}")
+            return
+        self._names.add(filename)
+        if self.dedup:
+            digest = hashlib.sha256(content).hexdigest()
+            stored = self._hashes.setdefault(digest, filename)
+            if stored != filename:
+                self.aliases[filename] = stored
+                self.duplicates += 1
+                return
+        self._zip.writestr(filename, content)
+        self.written += 1
+        print(f"Saved: {filename}")
+
+    def copy_from(self, zf: zipfile.ZipFile) -> None:
+        """將另一個快照的所有頁面寫入（接續中斷的爬取時沿用已完成的頁面）"""
+        for filename, stored in read_snapshot_index(zf).items():
+            self._write(filename, zf.read(stored))
+
+    async def put(self, filename: str, content: bytes) -> None:
+        """將頁面放入寫入佇列；佇列已滿時等待"""
+        await self._queue.put((filename, content))
+
+    async def _run(self) -> None:
+        while (item := await self._queue.get()) is not None:
+            if self._error is not None:
+                continue
+            try:
+                await asyncio.to_thread(self._write, *item)
+            except Exception as e:
+                # 記錄錯誤後繼續清空佇列，避免等待寫入的 worker 卡住
+                self._error = e
+
+    async def __aenter__(self) -> "SnapshotWriter":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._queue.put(None)
+        await self._task
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        """寫入重複頁面對照表並關閉 ZIP"""
+        if self.aliases:
+            self._zip.writestr(DUPLICATES_NAME, json.dumps(self.aliases, ensure_ascii=False, indent=2))
+        self._zip.close()
+
+
+class LinkExtractor(HTMLParser):
+    """只收集 <a href> 的串流式解析器，不建立文件樹"""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.links: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href" and value is not None:
+                    self.links.append(value)
+                    break
+
+
+def extract_links(html: str) -> list[str]:
+    """擷取頁面中所有 <a href> 的原始值"""
+    parser = LinkExtractor()
+    parser.feed(html)
+    parser.close()
+    return parser.links
+
+
+def prettify_html(content: bytes) -> bytes:
+    """以 BeautifulSoup 重新排版 HTML（較耗 CPU，僅在 --prettify 時使用）"""
+    return BeautifulSoup(content, "html.parser").prettify().encode("utf-8")
+
+
+class HostThrottle:
+    """限制單一主機的同時請求數，並確保兩次請求之間至少間隔 delay 秒"""
+
+    def __init__(self, limit: int, delay: float) -> None:
+        self._semaphore = asyncio.Semaphore(max(limit, 1))
+        self._lock = asyncio.Lock()
+        self._delay = delay
+        self._next_time = 0.0
+
+    async def __aenter__(self) -> None:
+        await self._semaphore.acquire()
+        async with self._lock:
+            wait = self._next_time - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_time = time.monotonic() + self._delay
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._semaphore.release()
+
+
+class Crawler:
+    """以工作佇列與多個 worker 進行廣度優先爬取的非同步爬蟲"""
+
+    def __init__(
+        self,
+        base_url: str,
+        writer: SnapshotWriter,
+        *,
+        concurrency: int = CONFIG["concurrency"],
+        per_host_concurrency: int = CONFIG["per_host_concurrency"],
+        delay: float = CONFIG["delay"],
+        retries: int = CONFIG["retries"],
+        backoff: float = CONFIG["backoff"],
+        timeout: float = CONFIG["timeout"],
+        frontier: CrawlFrontier | None = None,
+        allowed_params: list[str] | None = None,
+        previous_zip: zipfile.ZipFile | None = None,
+        prettify: bool = False,
+    ) -> None:
+        self.allowed_params = allowed_params
+        self.start_url = base_url
+        # 正規化後的起始 URL，用於判斷連結是否在爬取範圍內
+        self.base_url = canonicalize_url(base_url, allowed_params)
+        self.writer = writer
+        self.concurrency = max(concurrency, 1)
+        self.per_host_concurrency = per_host_concurrency
+        self.delay = delay
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.prettify = prettify
+        # 已加入佇列的 URL（正規化後），避免重複爬取
+        self.visited_urls: set[str] = set()
+        self.frontier = frontier
+        # 上一次的快照；提供時對已記錄驗證資訊的頁面送出條件式請求
+        self.previous_zip = previous_zip
+        self._previous_index = read_snapshot_index(previous_zip) if previous_zip else {}
+        self.saved = 0
+        self.failed = 0
+        # 未變更的頁面數（304 或內容雜湊與上次相同）
+        self.unchanged = 0
+        # （正規化後的 URL, 實際請求的 URL）
+        self._queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        self._throttles: dict[str, HostThrottle] = {}
+        self._stopping = False
+
+    def enqueue(self, url: str) -> None:
+        """將 URL 加入佇列；正規化後已看過或不在起始 URL 範圍內的略過
+
+        正規化後的 URL 只作為去重複與狀態記錄的鍵，請求時使用發現時的 URL
+        （僅移除片段），目錄頁保留結尾斜線，不會多一次轉址，相對連結也不會解析錯誤。
+        """
+        key = canonicalize_url(url, self.allowed_params)
+        if key in self.visited_urls or not is_within_scope(key, self.base_url):
+            return
+        self.visited_urls.add(key)
+        url = urldefrag(url).url
+        if self.frontier is not None:
+            self.frontier.add(key, url)
+        self._queue.put_nowait((key, url))
+
+    def _mark(self, url: str, status: str) -> None:
+        if self.frontier is not None:
+            self.frontier.mark(url, status)
+
+    def _throttle(self, url: str) -> HostThrottle:
+        host = urlparse(url).netloc
+        if host not in self._throttles:
+            self._throttles[host] = HostThrottle(self.per_host_concurrency, self.delay)
+        return self._throttles[host]
+
+    def _conditional_headers(self, key: str) -> tuple[dict[str, str], PageRecord | None]:
+        """依上次快照的驗證資訊產生條件式請求標頭；上一個 ZIP 中沒有該頁時不送出"""
+        if self.frontier is None or self.previous_zip is None:
+            return {}, None
+        record = self.frontier.page_record(key)
+        if record is None or record.filename not in self._previous_index:
+            return {}, record
+        headers = {}
+        if record.etag:
+            headers["If-None-Match"] = record.etag
+        if record.last_modified:
+            headers["If-Modified-Since"] = record.last_modified
+        return headers, record
+
+    async def fetch(
+        self, client: httpx.AsyncClient, url: str, headers: dict[str, str] | None = None
+    ) -> httpx.Response | None:
+        """取得頁面，連線錯誤、429 與 5xx 回應以指數退避重試；最終失敗時回傳 None"""
+        for attempt in range(self.retries + 1):
+            wait = self.backoff * (2**attempt)
+            try:
+                async with self._throttle(url):
+                    response = await client.get(url, headers=headers)
+                if response.status_code == httpx.codes.NOT_MODIFIED:
+                    return response
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return response
+                # 伺服器指定的 Retry-After（秒）優先於退避時間
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    wait = max(wait, float(retry_after))
+                error = f"HTTP {response.status_code}"
+            except httpx.HTTPStatusError as e:
+                # 4xx（429 除外）重試也不會成功
+                print(f"Error crawling {url}: {e}")
+                return None
+            except httpx.TransportError as e:
+                error = repr(e)
+            if attempt < self.retries:
+                print(f"Retrying {url} in {wait:.1f}s ({error})")
+                await asyncio.sleep(wait)
+        print(f"Error crawling {url}: {error}")
+        return None
+
+    async def process(self, client: httpx.AsyncClient, key: str, url: str) -> None:
+        """爬取單一頁面：儲存內容並將頁面中的連結加入佇列
+
+        Args:
+            client: HTTP 客戶端
+            key: 正規化後的 URL，用於狀態、驗證資訊與快照檔名
+            url: 實際請求的 URL
+        """
+        print(f"Crawling: {url}")
+        headers, record = self._conditional_headers(key)
+        response = await self.fetch(client, url, headers)
+        if response is None:
+            self.failed += 1
+            self._mark(key, FAILED)
+            return
+        # 轉址後的最終 URL 也視為已爬取，之後連到該 URL 的連結不再重複抓取
+        final_url = canonicalize_url(str(response.url), self.allowed_params)
+        if final_url != key and final_url not in self.visited_urls:
+            self.visited_urls.add(final_url)
+            self._mark(final_url, DONE)
+
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            # 頁面未變更：沿用上一個快照的內容，仍需從中取得連結以繼續爬取
+            content = self.previous_zip.read(self._previous_index[record.filename])
+            await self.writer.put(record.filename, content)
+            links = extract_links(content.decode("utf-8", errors="replace"))
+            self.unchanged += 1
+        else:
+            content = prettify_html(response.content) if self.prettify else response.content
+            await self.writer.put(sanitize_filename(key), content)
+            links = extract_links(response.text)
+            digest = hashlib.sha256(response.content).hexdigest()
+            # 未提供驗證標頭的伺服器，以內容雜湊判斷是否變更
+            if record is not None and record.sha256 == digest:
+                self.unchanged += 1
+            if self.frontier is not None:
+                self.frontier.save_page_record(
+                    key,
+                    PageRecord(
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                        digest,
+                        sanitize_filename(key),
+                    ),
+                )
+        self.saved += 1
+
+        # 相對連結以實際回應的 URL（含轉址）為基準
+        for link in links:
+            self.enqueue(urljoin(str(response.url), link))
+        self._mark(key, DONE)
+
+    async def _worker(self, client: httpx.AsyncClient) -> None:
+        # 請求進行中被取消時 httpx 可能吞掉 CancelledError 並正常回傳，
+        # 因此另以旗標判斷是否停止，避免 worker 回到佇列等待而無法結束
+        while not self._stopping:
+            key, url = await self._queue.get()
+            try:
+                await self.process(client, key, url)
+            except Exception as e:
+                self.failed += 1
+                self._mark(key, FAILED)
+                print(f"Error crawling {url}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def run(self) -> None:
+        """從起始 URL 開始爬取，直到佇列清空"""
+        limits = httpx.Limits(
+            max_connections=self.concurrency, max_keepalive_connections=self.concurrency
+        )
+        async with self.writer, httpx.AsyncClient(
+            timeout=self.timeout, limits=limits, follow_redirects=True
+        ) as client:
+            if self.frontier is not None:
+                # 接續上次中斷的爬取：已記錄的 URL 不再加入，未完成與失敗的重新爬取
+                self.visited_urls.update(self.frontier.known_urls())
+                for key, url in self.frontier.unfinished_urls():
+                    self._queue.put_nowait((key, url))
+                # 已完成但頁面不在快照中（中斷時尚未寫入 ZIP）的 URL 也重新爬取
+                for key, url in self.frontier.finished_urls():
+                    record = self.frontier.page_record(key)
+                    if record is not None and record.filename not in self.writer:
+                        self._queue.put_nowait((key, url))
+            self.enqueue(self.start_url)
+            workers = [
+                asyncio.create_task(self._worker(client)) for _ in range(self.concurrency)
+            ]
+            try:
+                await self._queue.join()
+            finally:
+                self._stopping = True
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+
+def find_previous_zip(output_dir: str) -> str | None:
+    """找出同一前綴最近一次產生的快照 ZIP（檔名含時間戳記，依名稱排序即為時間順序）"""
+    snapshots = sorted(glob.glob(f"{glob.escape(output_dir)}_*.zip"))
+    return snapshots[-1] if snapshots else None
+
+
+def parse_arguments() -> argparse.Namespace:
+    """解析命令列參數"""
+    parser = argparse.ArgumentParser(description="爬取網站頁面並壓縮為 ZIP 快照")
+    parser.add_argument("--url", default=CONFIG["base_url"], help="起始 URL")
+    parser.add_argument("--output-dir", default=CONFIG["output_dir"], help="快照名稱前綴，ZIP 檔名為 <output-dir>_<時間戳記>.zip")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=CONFIG["concurrency"],
+        help=f"全域同時請求數上限（預設：{CONFIG['concurrency']}）",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=CONFIG["per_host_concurrency"],
+        help=f"每個主機的同時請求數上限（預設：{CONFIG['per_host_concurrency']}）",
+    )
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=CONFIG["delay"],
+        help=f"同一主機兩次請求的最小間隔秒數（預設：{CONFIG['delay']}）",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=CONFIG["retries"],
+        help=f"失敗時的重試次數（預設：{CONFIG['retries']}）",
+    )
+    parser.add_argument(
+        "--keep-params",
+        help="以逗號分隔的查詢參數白名單，其餘參數在比對 URL 時忽略（預設保留 utm_* 等追蹤參數以外的所有參數）",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="沿用上次的爬取狀態與最新的 ZIP 快照，只爬取尚未完成或失敗的 URL",
+    )
+    parser.add_argument(
+        "--prettify",
+        action="store_true",
+        help="以 BeautifulSoup 重新排版後再儲存（預設原樣儲存回應內容，速度較快）",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="增量快照：以條件式請求略過未變更的頁面，內容沿用上一個 ZIP",
+    )
+    parser.add_argument(
+        "--previous",
+        help="增量快照比對或接續的上一個 ZIP（預設：<output-dir>_*.zip 中最新的一個）",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=COMPRESSION_METHODS,
+        default="deflate",
+        help="ZIP 壓縮方式：deflate 或 store（不壓縮，速度最快）（預設：deflate）",
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        default=CONFIG["compress_level"],
+        help=f"deflate 壓縮等級 0-9（預設：{CONFIG['compress_level']}）",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help=f"內容相同的頁面只儲存一次，其餘檔名記錄於 ZIP 內的 {DUPLICATES_NAME}",
+    )
+    return parser.parse_args()
+
 
 def main():
+    args = parse_arguments()
+    zip_filename = f"{args.output_dir}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+
+    previous_zip = None
+    if args.incremental or args.resume:
+        previous_path = args.previous or find_previous_zip(args.output_dir)
+        try:
+            previous_zip = zipfile.ZipFile(previous_path) if previous_path else None
+        except zipfile.BadZipFile:
+            # 強制終止時 ZIP 可能缺少目錄區，無法讀取
+            print(f"Cannot read previous snapshot {previous_path}, ignoring it")
+        if previous_zip is not None:
+            print(f"Based on previous snapshot {previous_path}")
+        else:
+            print("No previous snapshot found, crawling all pages")
+
+    writer = SnapshotWriter(
+        zip_filename,
+        compression=COMPRESSION_METHODS[args.compression],
+        compresslevel=args.compress_level if args.compression == "deflate" else None,
+        dedup=args.dedup,
+    )
+    if args.resume and previous_zip is not None:
+        # 沿用中斷前已寫入的頁面
+        writer.copy_from(previous_zip)
+
     # 開始爬取
-    crawl_page(base_url)
-    
-    # 壓縮檔案
-    create_zip()
-    
-    # 可選：刪除臨時資料夾
-    # import shutil
-    # shutil.rmtree(output_dir)
-    
+    frontier = CrawlFrontier(
+        pathlib.Path(CONFIG["state_path"].format(output_dir=args.output_dir)),
+        resume=args.resume,
+    )
+    crawler = Crawler(
+        args.url,
+        writer,
+        concurrency=args.concurrency,
+        per_host_concurrency=args.per_host,
+        delay=args.delay,
+        retries=args.retries,
+        frontier=frontier,
+        allowed_params=args.keep_params.split(",") if args.keep_params else None,
+        previous_zip=previous_zip,
+        prettify=args.prettify,
+    )
+    started = time.perf_counter()
+    try:
+        asyncio.run(crawler.run())
+    finally:
+        writer.close()
+        counts = frontier.counts()
+        frontier.close()
+        if previous_zip is not None:
+            previous_zip.close()
+    elapsed = time.perf_counter() - started
+    print(
+        f"Crawled {crawler.saved} pages ({crawler.unchanged} unchanged, "
+        f"{crawler.failed} failed) in {elapsed:.1f}s"
+    )
+    print(f"Crawl state: {counts.get(DONE, 0)} done, {counts.get(FAILED, 0)} failed")
+    print(f"Stored {writer.written} pages ({writer.duplicates} duplicates) in {zip_filename}")
+
     print(f"Done! Download the ZIP file: {zip_filename}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,74 @@
+"""API 重試工具模組
+
+此模組提供 asyncio 環境下的 API 呼叫重試：速率限制（429）、伺服器暫時錯誤（5xx）
+與連線錯誤以指數退避重試，伺服器以 Retry-After 指定等待時間時優先採用；
+其他錯誤（例如 400 參數錯誤、401 金鑰無效）直接拋出，不浪費請求重送。
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 可重試的 HTTP 狀態碼
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+T = TypeVar("T")
+
+
+def is_retryable(error: BaseException) -> bool:
+    """判斷錯誤是否為暫時性錯誤（速率限制、伺服器暫時錯誤或連線錯誤）
+
+    google-genai 的 APIError 以 code 屬性提供 HTTP 狀態碼。
+    """
+    if isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    return getattr(error, "code", None) in RETRY_STATUS
+
+
+def retry_after(error: BaseException) -> float | None:
+    """取得錯誤回應中 Retry-After 標頭指定的等待秒數，沒有時回傳 None"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    value = headers.get("Retry-After", "") if headers else ""
+    return float(value) if value.isdigit() else None
+
+
+async def call_with_retry(
+    call: Callable[[], Awaitable[T]],
+    retries: int,
+    backoff: float,
+    description: str = "API 請求",
+) -> T:
+    """呼叫 call，暫時性錯誤時以指數退避重試
+
+    每次重試都會重新呼叫 call，因此應把取得 semaphore、速率限制額度等
+    每次請求都需要的步驟放在 call 內，退避等待期間才不會佔用名額。
+
+    Args:
+        call: 送出一次請求的協程函式
+        retries: 最多重試次數
+        backoff: 第一次重試前的等待秒數，之後每次加倍
+        description: 記錄日誌時使用的請求描述
+
+    Returns:
+        call 的回傳值
+
+    Raises:
+        非暫時性錯誤，或重試 retries 次後仍失敗的最後一個錯誤
+    """
+    for attempt in range(retries):
+        try:
+            return await call()
+        except Exception as e:
+            if not is_retryable(e):
+                raise
+            # 伺服器指定的 Retry-After（秒）優先於退避時間
+            wait = max(backoff * (2**attempt), retry_after(e) or 0.0)
+            logger.warning(
+                "%s 失敗（%s），%.1f 秒後重試（%d/%d）", description, e, wait, attempt + 1, retries
+            )
+            await asyncio.sleep(wait)
+    return await call()
@@ -0,0 +1,203 @@
+"""爬蟲 URL 正規化與可恢復的待爬清單（frontier）模組
+
+此模組提供 URL 正規化，讓 `page#a`、`page#b`、`page/` 與 `page` 等指向同一頁的
+網址視為同一個 URL（正規化後的 URL 只作為去重複的鍵，實際請求仍使用發現時的 URL）；
+並以 SQLite 保存每個 URL 的爬取狀態，爬蟲中斷後可從尚未完成的 URL 接續，
+不會重新爬取已完成的頁面。
+另保存每個頁面上次快照的 ETag、Last-Modified 與內容雜湊，供增量快照送出條件式請求。
+"""
+
+import pathlib
+import sqlite3
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 預設移除的追蹤用查詢參數（前綴比對）
+TRACKING_PARAM_PREFIXES = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+# URL 狀態
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class PageRecord(NamedTuple):
+    """上次快照中單一頁面的驗證資訊"""
+
+    # 回應的 ETag 標頭
+    etag: str | None
+    # 回應的 Last-Modified 標頭
+    last_modified: str | None
+    # 回應內容的 SHA-256
+    sha256: str
+    # 頁面在快照中的檔名
+    filename: str
+
+
+def canonicalize_url(url: str, allowed_params: Iterable[str] | None = None) -> str:
+    """將 URL 正規化為唯一的表示方式，作為去重複與狀態記錄的鍵
+
+    正規化後的 URL 不一定能直接請求（例如移除結尾斜線後，目錄頁可能多一次轉址
+    或回應不同內容），請求時應使用發現時的 URL。
+
+    - scheme 與主機名稱轉為小寫，移除預設連接埠
+    - 移除片段（#fragment）
+    - 移除路徑結尾的斜線（根路徑 `/` 除外），空路徑視為 `/`
+    - 查詢參數依名稱排序；提供 allowed_params 時只保留白名單中的參數，
+      否則移除 utm_* 等追蹤參數
+
+    Args:
+        url: 絕對 URL
+        allowed_params: 查詢參數白名單，None 表示保留所有非追蹤參數
+
+    Returns:
+        正規化後的 URL
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port is not None and str(parts.port) != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{userinfo}@{host}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    if allowed_params is not None:
+        allowed = set(allowed_params)
+        params = [(k, v) for k, v in params if k in allowed]
+    else:
+        params = [(k, v) for k, v in params if not k.startswith(TRACKING_PARAM_PREFIXES)]
+    query = urlencode(sorted(params))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def is_within_scope(url: str, base_url: str) -> bool:
+    """判斷正規化後的 url 是否位於正規化後的 base_url 之下（同主機且路徑相同或為子路徑）"""
+    target, base = urlsplit(url), urlsplit(base_url)
+    if (target.scheme, target.netloc) != (base.scheme, base.netloc):
+        return False
+    base_path = base.path.rstrip("/")
+    return target.path == base.path or target.path.startswith(base_path + "/")
+
+
+class CrawlFrontier:
+    """以 SQLite 保存的 URL 狀態表：pending（已加入待爬）、done（完成）、failed（失敗）
+
+    url 欄位為正規化後的 URL，fetch_url 為發現時實際要請求的 URL。
+
+    頁面驗證資訊另存於 pages 表，不隨重新開始而清空，供下一次快照比對。
+    """
+
+    def __init__(self, db_path: pathlib.Path, resume: bool = False) -> None:
+        """
+        Args:
+            db_path: SQLite 資料庫檔案路徑，上層目錄不存在時會自動建立
+            resume: 是否沿用既有狀態；否則清空後重新開始
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        # WAL 模式下頻繁的小交易不需每次等待完整同步
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                fetch_url TEXT
+            )
+            """
+        )
+        # 舊版狀態檔沒有 fetch_url 欄位，沿用時補上（缺值時以 url 請求）
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(urls)")}
+        if "fetch_url" not in columns:
+            self._conn.execute("ALTER TABLE urls ADD COLUMN fetch_url TEXT")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                sha256 TEXT NOT NULL,
+                filename TEXT NOT NULL
+            )
+            """
+        )
+        if not resume:
+            self._conn.execute("DELETE FROM urls")
+        self._conn.commit()
+
+    def known_urls(self) -> List[str]:
+        """所有已記錄的 URL（不論狀態），供重建已訪問集合"""
+        return [row[0] for row in self._conn.execute("SELECT url FROM urls")]
+
+    def unfinished_urls(self) -> List[Tuple[str, str]]:
+        """尚未完成（pending）或失敗（failed）的（URL, 請求 URL），恢復時重新加入佇列"""
+        return list(
+            self._conn.execute(
+                "SELECT url, COALESCE(fetch_url, url) FROM urls "
+                "WHERE status IN (?, ?) ORDER BY rowid",
+                (PENDING, FAILED),
+            )
+        )
+
+    def finished_urls(self) -> List[Tuple[str, str]]:
+        """已完成（done）的（URL, 請求 URL）"""
+        return list(
+            self._conn.execute(
+                "SELECT url, COALESCE(fetch_url, url) FROM urls WHERE status = ?", (DONE,)
+            )
+        )
+
+    def add(self, url: str, fetch_url: str | None = None) -> None:
+        """記錄新加入佇列的 URL（已存在時不變更狀態）
+
+        Args:
+            url: 正規化後的 URL
+            fetch_url: 實際請求的 URL，None 表示與 url 相同
+        """
+        self._conn.execute(
+            "INSERT OR IGNORE INTO urls (url, status, fetch_url) VALUES (?, ?, ?)",
+            (url, PENDING, fetch_url),
+        )
+
+    def mark(self, url: str, status: str) -> None:
+        """更新 URL 狀態並提交，目前為止的變更在中斷後仍會保留"""
+        self._conn.execute(
+            "INSERT INTO urls (url, status) VALUES (?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET status = excluded.status",
+            (url, status),
+        )
+        self._conn.commit()
+
+    def page_record(self, url: str) -> PageRecord | None:
+        """取得 URL 上次快照的驗證資訊，從未成功爬取時回傳 None"""
+        row = self._conn.execute(
+            "SELECT etag, last_modified, sha256, filename FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        return PageRecord(*row) if row else None
+
+    def save_page_record(self, url: str, record: PageRecord) -> None:
+        """保存 URL 本次快照的驗證資訊（於下一次 mark 時一併提交）"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO pages (url, etag, last_modified, sha256, filename) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (url, *record),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        """各狀態的 URL 數量"""
+        return dict(self._conn.execute("SELECT status, COUNT(*) FROM urls GROUP BY status"))
+
+    def close(self) -> None:
+        """提交並關閉資料庫連線"""
+        self._conn.commit()
+        self._conn.close()
@@ -0,0 +1,117 @@
+"""工作日誌與原子寫入工具模組
+
+此模組提供長時間翻譯工作的 append-only 工作日誌：每完成一筆結果就以
+JSON Lines 追加一行並 flush，程式中斷後可重播日誌、只送出剩餘的請求。
+另提供先寫入暫存檔再以 rename 取代目標檔的原子寫入，
+確保輸出檔不會停留在寫到一半的狀態。
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import tempfile
+from typing import Any, Dict, Iterator, List, TextIO
+
+logger = logging.getLogger(__name__)
+
+
+@contextlib.contextmanager
+def atomic_write(path: pathlib.Path, encoding: str = "utf-8") -> Iterator[TextIO]:
+    """以暫存檔寫入，正常結束時才以 rename 取代目標檔；發生例外時保留原檔
+
+    Args:
+        path: 目標檔案路徑
+        encoding: 檔案編碼
+
+    Yields:
+        以文字模式開啟的暫存檔物件
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 暫存檔與目標檔放在同一目錄，rename 才能保證是原子操作
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp 建立的檔案權限為 0600，改為沿用原檔權限
+        try:
+            os.chmod(temp_name, path.stat().st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(temp_name, 0o644)
+        with open(fd, "w", encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_name)
+        raise
+
+
+def build_run_key(*parts: Any) -> str:
+    """由工作參數（輸入檔、語言、模型等）計算工作識別碼，相同參數的工作可互相恢復"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class RunJournal:
+    """以 JSON Lines 記錄已完成結果的 append-only 工作日誌
+
+    第一行為記錄工作識別碼的標頭，其後每行為一筆結果。
+    行程中斷時最後一行可能寫到一半，重播時會略過無法解析的行。
+    """
+
+    def __init__(self, path: pathlib.Path, run_key: str, resume: bool = False) -> None:
+        """
+        Args:
+            path: 日誌檔案路徑
+            run_key: 工作識別碼，重播時只接受識別碼相同的日誌
+            resume: 是否重播既有日誌；否則捨棄既有日誌重新開始
+        """
+        self.path = path
+        self.records: List[Dict[str, Any]] = self._replay(run_key) if resume else []
+        # 先以原子寫入整理出完整的日誌（去除寫到一半的行），之後再以追加模式寫入
+        with atomic_write(path) as f:
+            for record in [{"run": run_key}, *self.records]:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _replay(self, run_key: str) -> List[Dict[str, Any]]:
+        """讀取既有日誌中的結果，日誌不存在或屬於其他工作時回傳空清單"""
+        if not self.path.is_file():
+            logger.info("找不到工作日誌 %s，從頭開始", self.path)
+            return []
+        records: List[Dict[str, Any]] = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if line_no == 0:
+                    if record.get("run") != run_key:
+                        logger.warning("工作日誌 %s 屬於其他工作，從頭開始", self.path)
+                        return []
+                    continue
+                records.append(record)
+        logger.info("從工作日誌 %s 恢復 %d 筆結果", self.path, len(records))
+        return records
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """追加一筆結果並立即 flush，行程中斷時已寫入的結果不會遺失"""
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        """關閉日誌並保留檔案，供下次以 --resume 恢復"""
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def complete(self) -> None:
+        """工作順利完成：關閉並刪除日誌"""
+        self.close()
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
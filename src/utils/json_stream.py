@@ -0,0 +1,114 @@
+"""JSON 物件增量解析模組
+
+此模組提供逐段餵入文字、邊收邊解析的 JSON 物件解析器，
+每當一組 `"key": value` 完整出現就立即回傳，不需等待整份回應；
+回應中途被截斷時，已完整的鍵值對仍可取得。
+可自動略過 Markdown 的 ```json 程式碼區塊標記。
+"""
+
+import json
+from typing import Any, List, Tuple
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJsonObjectParser:
+    """逐段解析單一層 JSON 物件的鍵值對"""
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+
+    @property
+    def finished(self) -> bool:
+        """是否已讀到物件結尾的 `}`"""
+        return self._finished
+
+    def _skip(self, chars: str) -> None:
+        """略過目前位置起屬於 chars 的字元"""
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in chars:
+            self._pos += 1
+
+    def _find_start(self) -> bool:
+        """尋找物件開頭的 `{`，其前的 Markdown 標記等文字一律略過"""
+        start = self._buffer.find("{", self._pos)
+        if start == -1:
+            self._pos = len(self._buffer)
+            return False
+        self._pos = start + 1
+        self._started = True
+        return True
+
+    def _next_pair(self, final: bool) -> Tuple[str, Any] | None:
+        """嘗試從目前位置解析一組完整的鍵值對，資料不足時回傳 None 且不移動位置"""
+        start = self._pos
+        self._skip(_WHITESPACE + ",")
+        if self._pos >= len(self._buffer):
+            self._pos = start
+            return None
+        if self._buffer[self._pos] == "}":
+            self._pos += 1
+            self._finished = True
+            return None
+        try:
+            key, pos = _DECODER.raw_decode(self._buffer, self._pos)
+            while pos < len(self._buffer) and self._buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= len(self._buffer) or self._buffer[pos] != ":":
+                raise ValueError("缺少冒號")
+            pos += 1
+            while pos < len(self._buffer) and self._buffer[pos] in _WHITESPACE:
+                pos += 1
+            value, end = _DECODER.raw_decode(self._buffer, pos)
+        except ValueError:
+            self._pos = start
+            return None
+        # 非字串值（例如數字）可能尚未讀完，需看到後續的分隔字元才能確定完整
+        if not isinstance(value, str) and not final:
+            rest = self._buffer[end:].lstrip(_WHITESPACE)
+            if not rest:
+                self._pos = start
+                return None
+        if not isinstance(key, str):
+            self._pos = start
+            return None
+        self._pos = end
+        return key, value
+
+    def _drain(self, final: bool) -> List[Tuple[str, Any]]:
+        """取出目前緩衝區中所有已完整的鍵值對"""
+        pairs: List[Tuple[str, Any]] = []
+        if not self._started and not self._find_start():
+            return pairs
+        while not self._finished:
+            pair = self._next_pair(final)
+            if pair is None:
+                break
+            pairs.append(pair)
+        # 丟棄已解析的部分，避免緩衝區隨回應長度成長
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        return pairs
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """餵入一段文字
+
+        Args:
+            text: 串流回應中新收到的文字
+
+        Returns:
+            此次新完成的（鍵, 值）清單
+        """
+        if self._finished:
+            return []
+        self._buffer += text
+        return self._drain(final=False)
+
+    def close(self) -> List[Tuple[str, Any]]:
+        """串流結束時呼叫，取出最後剩餘的完整鍵值對（不完整的部分會被捨棄）"""
+        if self._finished:
+            return []
+        return self._drain(final=True)
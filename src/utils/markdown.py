@@ -0,0 +1,174 @@
+"""Markdown 分段工具模組
+
+此模組依 Markdown 結構（front matter、程式碼區塊、標題、段落）將文件切分為
+大小受限的片段，不需翻譯的部分（front matter、程式碼區塊、僅含 URL 的行、
+連結參考定義、空行）會標記為原樣保留。所有片段依序串接即可還原原文。
+片段的切分點由區塊內容決定（content-defined chunking），修改一個段落
+不會移動其他片段的邊界。
+"""
+
+import hashlib
+import re
+from typing import List, NamedTuple
+
+# 預設每個可翻譯片段的最大字元數
+DEFAULT_MAX_CHUNK_CHARS = 4000
+
+# 標題作為切分點的權重倍數，讓切分點較常落在章節邊界
+_HEADING_ANCHOR_WEIGHT = 4
+
+_FENCE_PATTERN = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_HEADING_PATTERN = re.compile(r"^ {0,3}#{1,6}(\s|$)")
+# 僅含 URL（可帶角括號）、連結參考定義或單行 HTML 註解的行
+_PASSTHROUGH_LINE_PATTERN = re.compile(
+    r"^\s*(<?https?://\S+>?|\[[^\]]+\]:\s*\S+.*|<!--.*-->)\s*$"
+)
+
+
+class Segment(NamedTuple):
+    """文件中的一個片段"""
+
+    # 片段原文
+    text: str
+    # 是否需要送出翻譯；False 表示原樣保留
+    translate: bool
+
+
+def _split_blocks(lines: List[str]) -> List[Segment]:
+    """將文件行切分為區塊：每個標題、段落為一個可翻譯區塊，其餘為保留區塊"""
+    blocks: List[Segment] = []
+    i = 0
+    # 文件開頭的 YAML front matter
+    if lines and lines[0].rstrip("\r\n") == "---":
+        for j in range(1, len(lines)):
+            if lines[j].rstrip("\r\n") in ("---", "..."):
+                blocks.append(Segment("".join(lines[: j + 1]), False))
+                i = j + 1
+                break
+
+    paragraph: List[str] = []
+
+    def end_paragraph() -> None:
+        if paragraph:
+            blocks.append(Segment("".join(paragraph), True))
+            paragraph.clear()
+
+    while i < len(lines):
+        line = lines[i]
+        fence = _FENCE_PATTERN.match(line)
+        if fence:
+            end_paragraph()
+            marker = fence.group(1)
+            j = i + 1
+            while j < len(lines):
+                closing = _FENCE_PATTERN.match(lines[j])
+                if closing:
+                    closing_marker = closing.group(1)
+                    if closing_marker[0] == marker[0] and len(closing_marker) >= len(marker):
+                        break
+                j += 1
+            blocks.append(Segment("".join(lines[i : j + 1]), False))
+            i = j + 1
+            continue
+        if not line.strip() or _PASSTHROUGH_LINE_PATTERN.match(line):
+            end_paragraph()
+            blocks.append(Segment(line, False))
+        elif _HEADING_PATTERN.match(line):
+            end_paragraph()
+            blocks.append(Segment(line, True))
+        else:
+            paragraph.append(line)
+        i += 1
+    end_paragraph()
+    return blocks
+
+
+def _strip_newlines(segment: Segment) -> List[Segment]:
+    """將可翻譯片段前後的換行拆為保留片段，避免模型增刪空行影響版面"""
+    text = segment.text
+    body = text.strip("\r\n")
+    if not body:
+        return [Segment(text, False)]
+    start = text.index(body)
+    parts = [
+        Segment(text[:start], False),
+        Segment(body, True),
+        Segment(text[start + len(body) :], False),
+    ]
+    return [part for part in parts if part.text]
+
+
+def _is_anchor(block: Segment, target_chars: int) -> bool:
+    """判斷區塊是否為切分點（在此區塊之前另起新片段）
+
+    只依區塊本身的內容決定：以內容雜湊換算為 [0, 1) 的值，小於
+    「區塊字元數 / 目標片段大小」時即為切分點，因此片段平均約為 target_chars，
+    且修改某個段落只會影響該段落所在的片段。標題的權重較高。
+    """
+    weight = len(block.text)
+    if _HEADING_PATTERN.match(block.text):
+        weight *= _HEADING_ANCHOR_WEIGHT
+    digest = hashlib.blake2b(block.text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64 < weight / max(target_chars, 1)
+
+
+def split_markdown(content: str, max_chars: int = DEFAULT_MAX_CHUNK_CHARS) -> List[Segment]:
+    """將 Markdown 文件切分為可翻譯與保留的片段
+
+    相鄰的標題與段落（含其間的空行）會合併為不超過 max_chars 的片段。
+    切分點由區塊內容決定（見 _is_anchor，平均約為 max_chars 的一半），
+    與前面片段的大小無關；修改或增刪一個段落後，只有該段落所在的片段內容改變，
+    其餘片段與上次相同，可沿用既有譯文。合併後會超過 max_chars 時才強制切分，
+    之後在下一個切分點恢復一致。單一區塊超過上限時仍獨立成一個片段。
+
+    Args:
+        content: 文件內容
+        max_chars: 每個可翻譯片段的最大字元數
+
+    Returns:
+        依序排列的片段，所有片段的 text 串接後等於原文
+    """
+    blocks = _split_blocks(content.splitlines(keepends=True))
+    segments: List[Segment] = []
+    current: List[Segment] = []
+    size = 0
+
+    def end_chunk() -> None:
+        nonlocal size
+        # 片段結尾的空行不屬於片段內容
+        trailing: List[Segment] = []
+        while current and not current[-1].translate:
+            trailing.insert(0, current.pop())
+        if current:
+            segments.extend(_strip_newlines(Segment("".join(b.text for b in current), True)))
+        segments.extend(trailing)
+        current.clear()
+        size = 0
+
+    for block in blocks:
+        blank = not block.translate and not block.text.strip()
+        if not block.translate and not blank:
+            end_chunk()
+            segments.append(block)
+            continue
+        if block.translate:
+            if current and (
+                size + len(block.text) > max_chars or _is_anchor(block, max_chars // 2)
+            ):
+                end_chunk()
+        elif not current:
+            segments.append(block)
+            continue
+        current.append(block)
+        size += len(block.text)
+    end_chunk()
+
+    # 合併相鄰的保留片段，減少後續處理的片段數
+    merged: List[Segment] = []
+    for segment in segments:
+        if merged and not segment.translate and not merged[-1].translate:
+            merged[-1] = Segment(merged[-1].text + segment.text, False)
+        else:
+            merged.append(segment)
+    return merged
+
@@ -0,0 +1,249 @@
+"""財務指標欄式儲存與向量化分析模組
+
+此模組將 API 回傳的財務指標（每期一個 dict 的清單）轉為欄式的 NumPy 陣列：
+每檔股票、每種期間一個 .npz 檔，內含依報告日期排序的日期陣列與每個指標一個
+float64 陣列（缺值為 NaN）。新的期別以合併方式追加，不需重寫其他股票的資料。
+另提供跨股票對齊後的二維陣列（股票 × 期別），以及成長率、移動平均與
+橫斷面排名等向量化計算。
+"""
+
+import contextlib
+import os
+import pathlib
+import re
+import tempfile
+from typing import Any, Dict, Iterable, List, NamedTuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# 作為時間軸的欄位
+DATE_FIELD = "report_period"
+
+_TICKER_PATTERN = re.compile(r"^[A-Z0-9.\-]+$")
+
+
+class TickerSeries(NamedTuple):
+    """單一股票、單一期間的欄式時間序列"""
+
+    # 報告日期（datetime64[D]，由舊到新）
+    dates: np.ndarray
+    # {指標名稱: 與 dates 等長的 float64 陣列}
+    metrics: Dict[str, np.ndarray]
+
+
+class Panel(NamedTuple):
+    """多檔股票的單一指標對齊後的二維陣列（股票 × 期別，由舊到新）"""
+
+    # 股票代號，對應 values 的列
+    tickers: List[str]
+    # 與 values 同 shape 的報告日期（datetime64[D]），缺值為 NaT
+    dates: np.ndarray
+    # shape 為 (股票數, 期數) 的 float64 陣列，缺值為 NaN
+    values: np.ndarray
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class MetricsStore:
+    """以目錄保存的欄式財務指標儲存區：<root>/<期間>/<股票代號>.npz"""
+
+    def __init__(self, root: pathlib.Path) -> None:
+        """
+        Args:
+            root: 儲存目錄，不存在時會自動建立
+        """
+        root.mkdir(parents=True, exist_ok=True)
+        self.root = root
+
+    def _path(self, ticker: str, period: str) -> pathlib.Path:
+        ticker = ticker.upper()
+        if not _TICKER_PATTERN.match(ticker):
+            raise ValueError(f"無效的股票代號：{ticker}")
+        return self.root / period / f"{ticker}.npz"
+
+    def tickers(self, period: str) -> List[str]:
+        """已儲存指定期間資料的股票代號"""
+        directory = self.root / period
+        if not directory.is_dir():
+            return []
+        return sorted(path.stem for path in directory.glob("*.npz"))
+
+    def load(
+        self, ticker: str, period: str, metrics: Iterable[str] | None = None
+    ) -> TickerSeries:
+        """讀取單一股票的時間序列，尚未儲存時回傳空序列
+
+        Args:
+            ticker: 股票代號
+            period: 期間
+            metrics: 只讀取這些指標（不存在的略過），None 表示全部
+        """
+        path = self._path(ticker, period)
+        if not path.is_file():
+            return TickerSeries(np.array([], dtype="datetime64[D]"), {})
+        # .npz 內每個陣列是獨立的成員，只解壓需要的指標
+        with np.load(path, allow_pickle=False) as data:
+            names = [name for name in data.files if name != DATE_FIELD]
+            if metrics is not None:
+                names = [name for name in metrics if name in data.files and name != DATE_FIELD]
+            return TickerSeries(data[DATE_FIELD], {name: data[name] for name in names})
+
+    def _save(self, path: pathlib.Path, series: TickerSeries) -> None:
+        """先寫入暫存檔再以 rename 取代，中斷時不會留下寫到一半的檔案"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with open(fd, "wb") as f:
+                np.savez(f, **{DATE_FIELD: series.dates}, **series.metrics)
+            os.replace(temp_name, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_name)
+            raise
+
+    def append(self, ticker: str, period: str, records: Iterable[Dict[str, Any]]) -> int:
+        """將 API 回傳的各期指標合併進既有資料
+
+        報告日期已存在的期別以新資料的數值覆蓋（財報可能修正），新資料缺少的指標
+        保留原值；只保存數值欄位，缺少報告日期的記錄略過。
+
+        Args:
+            ticker: 股票代號
+            period: 期間（annual、quarterly 或 ttm）
+            records: 各期的財務指標
+
+        Returns:
+            新增的期數
+        """
+        records = [r for r in records if r.get(DATE_FIELD)]
+        if not records:
+            return 0
+        existing = self.load(ticker, period)
+        new_dates = np.array([r[DATE_FIELD] for r in records], dtype="datetime64[D]")
+        dates = np.union1d(existing.dates, new_dates)
+        names = set(existing.metrics)
+        for record in records:
+            names.update(key for key, value in record.items() if _is_number(value))
+
+        old_index = np.searchsorted(dates, existing.dates)
+        new_index = np.searchsorted(dates, new_dates)
+        metrics: Dict[str, np.ndarray] = {}
+        for name in sorted(names):
+            column = np.full(len(dates), np.nan)
+            if name in existing.metrics:
+                column[old_index] = existing.metrics[name]
+            values = np.array(
+                [value if _is_number(value := record.get(name)) else np.nan for record in records]
+            )
+            present = ~np.isnan(values)
+            column[new_index[present]] = values[present]
+            metrics[name] = column
+        self._save(self._path(ticker, period), TickerSeries(dates, metrics))
+        return len(dates) - len(existing.dates)
+
+    def panel(
+        self,
+        tickers: Iterable[str],
+        period: str,
+        metric: str,
+        *,
+        align: str = "latest",
+        length: int | None = None,
+    ) -> Panel:
+        """取得多檔股票單一指標對齊後的二維陣列
+
+        Args:
+            tickers: 股票代號
+            period: 期間
+            metric: 指標名稱
+            align: "latest" 依各股票最近一期對齊（最後一欄為各自的最新財報，
+                會計年度結束日不同的公司也能互相比較）；"date" 依報告日期對齊
+            length: 只保留最後 length 期，None 表示全部
+
+        Returns:
+            Panel；沒有該指標的股票整列為 NaN
+        """
+        if align not in ("latest", "date"):
+            raise ValueError(f"不支援的對齊方式：{align}")
+        tickers = [ticker.upper() for ticker in tickers]
+        series = [self.load(ticker, period, [metric]) for ticker in tickers]
+        if align == "date":
+            columns = np.unique(
+                np.concatenate([s.dates for s in series] or [np.array([], dtype="datetime64[D]")])
+            )
+            width = len(columns)
+        else:
+            width = max((len(s.dates) for s in series), default=0)
+        values = np.full((len(tickers), width), np.nan)
+        dates = np.full((len(tickers), width), np.datetime64("NaT"), dtype="datetime64[D]")
+        for row, s in enumerate(series):
+            if align == "date":
+                index = np.searchsorted(columns, s.dates)
+            else:
+                index = np.arange(width - len(s.dates), width)
+            dates[row, index] = s.dates
+            if metric in s.metrics:
+                values[row, index] = s.metrics[metric]
+        if length is not None:
+            values, dates = values[:, -length:], dates[:, -length:]
+        return Panel(tickers, dates, values)
+
+
+def growth_rate(values: np.ndarray, lag: int = 1) -> np.ndarray:
+    """計算每期相對 lag 期前的成長率 (x[t] - x[t-lag]) / |x[t-lag]|
+
+    Args:
+        values: 時間在最後一個維度的陣列
+        lag: 比較的期數間隔
+
+    Returns:
+        與 values 同 shape 的陣列；前 lag 期、基期為 0 或缺值時為 NaN
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.full(values.shape, np.nan)
+    current, base = values[..., lag:], values[..., :-lag]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result[..., lag:] = np.where(base != 0, (current - base) / np.abs(base), np.nan)
+    return result
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """計算最後一個維度的移動平均
+
+    Args:
+        values: 時間在最後一個維度的陣列
+        window: 視窗期數
+
+    Returns:
+        與 values 同 shape 的陣列；前 window - 1 期或視窗內有缺值時為 NaN
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        result[..., window - 1 :] = sliding_window_view(values, window, axis=-1).mean(axis=-1)
+    return result
+
+
+def cross_sectional_rank(values: np.ndarray, descending: bool = True) -> np.ndarray:
+    """計算每一期（每一欄）各股票的排名，1 為第一名
+
+    Args:
+        values: shape 為 (股票數, 期數) 的陣列
+        descending: True 時數值最大者為第一名
+
+    Returns:
+        與 values 同 shape 的排名陣列；缺值為 NaN，同值依股票順序排名
+    """
+    values = np.asarray(values, dtype=float)
+    missing = np.isnan(values)
+    keys = -values if descending else values
+    # 缺值排在最後，不影響有值股票的名次
+    order = np.argsort(np.where(missing, np.inf, keys), axis=0, kind="stable")
+    ranks = np.empty(values.shape)
+    positions = np.arange(1, values.shape[0] + 1, dtype=float)[:, None]
+    np.put_along_axis(ranks, order, np.broadcast_to(positions, values.shape), axis=0)
+    ranks[missing] = np.nan
+    return ranks
@@ -0,0 +1,209 @@
+"""Java .properties 檔案串流讀寫模組
+
+此模組依 java.util.Properties 的格式規範逐行解析 .properties 檔案，
+支援 `=`、`:` 與空白分隔、`#`/`!` 註解、反斜線續行與跳脫字元，
+並保留每個邏輯行的原始內容，讓未變更的行可以原樣寫回。
+"""
+
+import re
+from typing import Iterable, Iterator, NamedTuple, TextIO
+
+from utils.unicode import escape_non_ascii
+
+# 鍵與值之間的分隔字元
+_SEPARATORS = "=:"
+# 鍵值對中視為空白的字元
+_WHITESPACE = " \t\f"
+# 跳脫序列對照表（不含 \uXXXX）
+_UNESCAPE_MAP = {"t": "\t", "n": "\n", "r": "\r", "f": "\f"}
+_ESCAPE_PATTERN = re.compile(r"\\(u[0-9a-fA-F]{4}|.)", re.DOTALL)
+_SURROGATE_PATTERN = re.compile("[\ud800-\udfff]")
+
+
+class PropertyLine(NamedTuple):
+    """.properties 檔案中的一個邏輯行"""
+
+    # 邏輯行序號（0 起算），可作為該行的唯一索引
+    index: int
+    # 解碼後的鍵；註解與空行為 None
+    key: str | None
+    # 解碼後的值；註解與空行為空字串
+    value: str
+    # 原始內容（不含行尾換行字元），續行時包含內部的換行
+    raw: str
+
+
+def _unescape_match(match: re.Match) -> str:
+    """將單一跳脫序列轉為對應字元"""
+    escaped = match.group(1)
+    if len(escaped) == 5:
+        return chr(int(escaped[1:], 16))
+    return _UNESCAPE_MAP.get(escaped, escaped)
+
+
+def unescape(text: str) -> str:
+    """依 .properties 規範解碼跳脫字元，並將 UTF-16 代理對合併為單一字元
+
+    Args:
+        text: 鍵或值的原始文字
+
+    Returns:
+        解碼後的字串
+    """
+    if "\\" not in text:
+        return text
+    decoded = _ESCAPE_PATTERN.sub(_unescape_match, text)
+    if _SURROGATE_PATTERN.search(decoded):
+        decoded = decoded.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+    return decoded
+
+
+def _escape_common(text: str) -> str:
+    """跳脫鍵與值共同需要處理的字元"""
+    return (
+        text.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\f", "\\f")
+    )
+
+
+def escape_key(key: str, ascii_only: bool = False) -> str:
+    """將鍵編碼為 .properties 格式
+
+    Args:
+        key: 原始鍵
+        ascii_only: 是否將非 ASCII 字元轉為 Unicode 跳脫序列
+
+    Returns:
+        可直接寫入檔案的鍵
+    """
+    escaped = _escape_common(key)
+    for char in " =:#!":
+        escaped = escaped.replace(char, "\\" + char)
+    return escape_non_ascii(escaped) if ascii_only else escaped
+
+
+def escape_value(value: str, ascii_only: bool = False) -> str:
+    """將值編碼為 .properties 格式
+
+    Args:
+        value: 原始值
+        ascii_only: 是否將非 ASCII 字元轉為 Unicode 跳脫序列
+
+    Returns:
+        可直接寫入檔案的值
+    """
+    escaped = _escape_common(value)
+    # 值開頭的空白在讀取時會被略過，必須跳脫才能保留
+    if escaped[:1] in (" ", "\t", "\f"):
+        escaped = "\\" + escaped
+    return escape_non_ascii(escaped) if ascii_only else escaped
+
+
+def format_entry(key: str, value: str, ascii_only: bool = False) -> str:
+    """將鍵值對格式化為 `key=value` 形式的單行文字"""
+    return f"{escape_key(key, ascii_only)}={escape_value(value, ascii_only)}"
+
+
+def _ends_with_continuation(line: str) -> bool:
+    """判斷實體行是否以奇數個反斜線結尾（表示下一行為續行）"""
+    count = len(line) - len(line.rstrip("\\"))
+    return count % 2 == 1
+
+
+def parse_logical_line(text: str) -> tuple[str, str]:
+    """將已合併續行的邏輯行拆解為（鍵, 值）
+
+    Args:
+        text: 已去除開頭空白與續行反斜線的邏輯行
+
+    Returns:
+        解碼後的（鍵, 值）
+    """
+    length = len(text)
+    pos = 0
+    # 鍵在第一個未跳脫的分隔字元或空白處結束
+    while pos < length:
+        char = text[pos]
+        if char == "\\":
+            pos += 2
+            continue
+        if char in _SEPARATORS or char in _WHITESPACE:
+            break
+        pos += 1
+    key_end = min(pos, length)
+    while pos < length and text[pos] in _WHITESPACE:
+        pos += 1
+    if pos < length and text[pos] in _SEPARATORS:
+        pos += 1
+        while pos < length and text[pos] in _WHITESPACE:
+            pos += 1
+    return unescape(text[:key_end]), unescape(text[pos:])
+
+
+def iter_properties(lines: Iterable[str]) -> Iterator[PropertyLine]:
+    """逐行串流解析 .properties 內容
+
+    Args:
+        lines: 實體行來源，通常為以文字模式開啟的檔案物件
+
+    Yields:
+        每個邏輯行（鍵值對、註解或空行）
+    """
+    index = 0
+    raw_parts: list[str] = []
+    logical_parts: list[str] = []
+    for physical in lines:
+        physical = physical.rstrip("\r\n")
+        if not raw_parts:
+            stripped = physical.lstrip(_WHITESPACE)
+            if not stripped or stripped[0] in "#!":
+                yield PropertyLine(index, None, "", physical)
+                index += 1
+                continue
+        else:
+            stripped = physical.lstrip(_WHITESPACE)
+        raw_parts.append(physical)
+        if _ends_with_continuation(stripped):
+            logical_parts.append(stripped[:-1])
+            continue
+        logical_parts.append(stripped)
+        key, value = parse_logical_line("".join(logical_parts))
+        yield PropertyLine(index, key, value, "\n".join(raw_parts))
+        index += 1
+        raw_parts, logical_parts = [], []
+    # 檔案結尾仍在續行中時，以已讀取的內容作為最後一行
+    if raw_parts:
+        key, value = parse_logical_line("".join(logical_parts))
+        yield PropertyLine(index, key, value, "\n".join(raw_parts))
+
+
+class PropertiesWriter:
+    """逐行寫出 .properties 內容，不需先在記憶體中組出整份檔案"""
+
+    def __init__(self, stream: TextIO, ascii_only: bool = False) -> None:
+        """
+        Args:
+            stream: 以文字模式開啟的輸出檔案物件
+            ascii_only: 新寫出的鍵值對是否將非 ASCII 字元轉為 Unicode 跳脫序列
+        """
+        self._stream = stream
+        self._ascii_only = ascii_only
+        self._first = True
+
+    def _write_line(self, text: str) -> None:
+        # 行與行之間以換行分隔，檔尾不額外補換行，與原本的輸出格式一致
+        if not self._first:
+            self._stream.write("\n")
+        self._stream.write(text)
+        self._first = False
+
+    def write_raw(self, raw: str) -> None:
+        """原樣寫出一個邏輯行（註解、空行或沿用的既有內容）"""
+        self._write_line(raw)
+
+    def write_entry(self, key: str, value: str) -> None:
+        """編碼並寫出一個鍵值對"""
+        self._write_line(format_entry(key, value, self._ascii_only))
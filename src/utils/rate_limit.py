@@ -0,0 +1,80 @@
+"""速率限制工具模組
+
+此模組提供 asyncio 環境下的令牌桶（token bucket）速率限制器，
+可同時限制每分鐘請求數（RPM）與每分鐘 token 數（TPM）。
+"""
+
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """以令牌桶同時限制每分鐘請求數與 token 數
+
+    兩個桶皆以「每分鐘額度」為容量，並依時間線性補充；
+    任一桶額度不足時會等待到兩者皆足夠才放行。
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int | None = None,
+        period: float = 60.0,
+    ) -> None:
+        """
+        Args:
+            requests_per_minute: 每分鐘允許的請求數，0 或負數表示不限制
+            tokens_per_minute: 每分鐘允許的 token 數，None 或 0 表示不限制
+            period: 額度補充週期（秒），預設 60 秒
+        """
+        self._rpm = max(requests_per_minute, 0)
+        self._tpm = max(tokens_per_minute or 0, 0)
+        self._period = period
+        self._request_allowance = float(self._rpm)
+        self._token_allowance = float(self._tpm)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """依經過時間補充兩個桶的額度"""
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        if self._rpm:
+            self._request_allowance = min(
+                self._rpm, self._request_allowance + elapsed * self._rpm / self._period
+            )
+        if self._tpm:
+            self._token_allowance = min(
+                self._tpm, self._token_allowance + elapsed * self._tpm / self._period
+            )
+
+    def _wait_time(self, tokens: int) -> float:
+        """計算取得額度前需等待的秒數，0 表示可立即放行"""
+        wait = 0.0
+        if self._rpm and self._request_allowance < 1:
+            wait = (1 - self._request_allowance) * self._period / self._rpm
+        if self._tpm and self._token_allowance < tokens:
+            wait = max(wait, (tokens - self._token_allowance) * self._period / self._tpm)
+        return wait
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """取得一次請求的額度，必要時等待
+
+        Args:
+            tokens: 此次請求預估消耗的 token 數；超過每分鐘上限時以上限計算
+        """
+        if self._tpm:
+            tokens = min(tokens, self._tpm)
+        # 以鎖序列化取得額度，避免多個協程同時看到足夠額度而超量放行
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self._rpm:
+                self._request_allowance -= 1
+            if self._tpm:
+                self._token_allowance -= tokens
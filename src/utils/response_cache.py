@@ -0,0 +1,87 @@
+"""API 回應快取模組
+
+此模組以 SQLite 將 API 回應（可序列化為 JSON 的資料）保存在本機，
+每筆資料帶有各自的有效期限（TTL），過期後視為未命中，
+重複查詢相同資料時不必再送出請求。
+"""
+
+import json
+import logging
+import pathlib
+import sqlite3
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """以 SQLite 儲存、每筆資料各自設定有效期限的回應快取"""
+
+    def __init__(self, db_path: pathlib.Path) -> None:
+        """
+        Args:
+            db_path: SQLite 資料庫檔案路徑，上層目錄不存在時會自動建立
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Any | None:
+        """取得未過期的快取資料，不存在或已過期時回傳 None"""
+        row = self._conn.execute(
+            "SELECT value FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """保存資料，ttl 秒後過期"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), time.time() + ttl),
+        )
+        self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """刪除已過期的資料
+
+        Returns:
+            被刪除的筆數
+        """
+        cursor = self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        self._conn.commit()
+        if cursor.rowcount:
+            logger.info("回應快取已刪除 %d 筆過期資料", cursor.rowcount)
+        return cursor.rowcount
+
+    def log_stats(self) -> None:
+        """輸出命中 / 未命中統計"""
+        total = self.hits + self.misses
+        ratio = self.hits / total * 100 if total else 0.0
+        logger.info(
+            "回應快取命中 %d 筆、未命中 %d 筆（命中率 %.1f%%）",
+            self.hits,
+            self.misses,
+            ratio,
+        )
+
+    def close(self) -> None:
+        """關閉資料庫連線"""
+        self._conn.close()
@@ -0,0 +1,172 @@
+"""翻譯記憶（Translation Memory）模組
+
+此模組以 SQLite 將已翻譯過的字串保存在本機，鍵值由
+（原文雜湊, 目標語言, 模型, Prompt 版本）組成，重複執行時可直接取用，
+並以最近最少使用（LRU）策略限制資料筆數。
+"""
+
+import hashlib
+import logging
+import pathlib
+import sqlite3
+import time
+from typing import Dict, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 預設最多保存的翻譯筆數
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+def text_hash(text: str) -> str:
+    """計算字串的 SHA-256 雜湊值（十六進位）"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """以 SQLite 儲存的翻譯記憶，支援批次查詢、寫入與容量上限淘汰"""
+
+    def __init__(
+        self,
+        db_path: pathlib.Path,
+        model: str,
+        prompt_version: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        """
+        Args:
+            db_path: SQLite 資料庫檔案路徑，上層目錄不存在時會自動建立
+            model: 使用的模型名稱，不同模型的譯文分開保存
+            prompt_version: Prompt 版本識別碼，Prompt 變更後舊譯文不再命中
+            max_entries: 最多保存的筆數，超過時淘汰最久未使用的資料
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.model = model
+        self.prompt_version = prompt_version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translations (
+                source_hash TEXT NOT NULL,
+                language TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (source_hash, language, model, prompt_version)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_translations_last_used "
+            "ON translations (last_used)"
+        )
+        self._conn.commit()
+
+    def get_many(self, texts: Iterable[str], language: str) -> Dict[str, str]:
+        """批次查詢原文的既有譯文
+
+        Args:
+            texts: 原文字串
+            language: 目標語言
+
+        Returns:
+            {原文: 譯文}，僅包含命中的項目
+        """
+        hashes = {text_hash(text): text for text in texts}
+        found: Dict[str, str] = {}
+        hash_list = list(hashes)
+        # SQLite 預設單一查詢最多 999 個參數，因此分段查詢
+        for i in range(0, len(hash_list), 900):
+            chunk = hash_list[i : i + 900]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"""
+                SELECT source_hash, translation FROM translations
+                WHERE language = ? AND model = ? AND prompt_version = ?
+                  AND source_hash IN ({placeholders})
+                """,
+                (language, self.model, self.prompt_version, *chunk),
+            ).fetchall()
+            for source_hash, translation in rows:
+                found[hashes[source_hash]] = translation
+
+        self.hits += len(found)
+        self.misses += len(hashes) - len(found)
+        if found:
+            now = time.time()
+            self._conn.executemany(
+                """
+                UPDATE translations SET last_used = ?
+                WHERE source_hash = ? AND language = ? AND model = ? AND prompt_version = ?
+                """,
+                [
+                    (now, text_hash(text), language, self.model, self.prompt_version)
+                    for text in found
+                ],
+            )
+            self._conn.commit()
+        return found
+
+    def put_many(self, pairs: Iterable[Tuple[str, str]], language: str) -> None:
+        """批次寫入（原文, 譯文），並在超過容量時淘汰舊資料
+
+        Args:
+            pairs: （原文, 譯文）序列
+            language: 目標語言
+        """
+        now = time.time()
+        self._conn.executemany(
+            """
+            INSERT OR REPLACE INTO translations
+                (source_hash, language, model, prompt_version, translation, last_used)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (text_hash(source), language, self.model, self.prompt_version, translated, now)
+                for source, translated in pairs
+            ],
+        )
+        self._conn.commit()
+        self.evict()
+
+    def evict(self) -> int:
+        """淘汰最久未使用的資料，使總筆數不超過上限
+
+        Returns:
+            被淘汰的筆數
+        """
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        self._conn.execute(
+            """
+            DELETE FROM translations WHERE rowid IN (
+                SELECT rowid FROM translations ORDER BY last_used ASC LIMIT ?
+            )
+            """,
+            (excess,),
+        )
+        self._conn.commit()
+        logger.info("翻譯記憶已淘汰 %d 筆最久未使用的資料", excess)
+        return excess
+
+    def log_stats(self) -> None:
+        """輸出命中 / 未命中統計"""
+        total = self.hits + self.misses
+        ratio = self.hits / total * 100 if total else 0.0
+        logger.info(
+            "翻譯記憶命中 %d 筆、未命中 %d 筆（命中率 %.1f%%）",
+            self.hits,
+            self.misses,
+            ratio,
+        )
+
+    def close(self) -> None:
+        """關閉資料庫連線"""
+        self._conn.close()
@@ -1,36 +1,160 @@
 """Unicode 字元處理工具模組
 
 此模組提供 Unicode 字元與轉義序列之間的轉換功能。
+
+轉換主要交由 Python 內建的 codec（`backslashreplace`、`raw_unicode_escape`）
+在 C 層一次處理整段字串，只有少數特殊情況才退回逐段處理；
+BMP 以外的字元（例如 emoji）會以 UTF-16 代理對 `\\uXXXX\\uXXXX` 表示，
+與 Java .properties 的格式一致。
 """
 
 import re
+from typing import TextIO
+
+# 串流處理時每次讀取的字元數
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_SURROGATE_PATTERN = re.compile("[\ud800-\udfff]")
+_LATIN1_ESCAPE_PATTERN = re.compile(r"\\x([0-9a-f]{2})")
+_ASTRAL_ESCAPE_PATTERN = re.compile(r"\\U([0-9a-f]{8})")
+# 前面有偶數個反斜線（含 0 個）的 \uXXXX 才是轉義序列，與 raw_unicode_escape 一致
+_UNICODE_ESCAPE_PATTERN = re.compile(r"(?<!\\)((?:\\\\)*)\\u([0-9a-fA-F]{4})")
+# 反斜線後接 U+00FF 以上的字元：raw_unicode_escape 編碼時會把該字元轉為 \uXXXX，
+# 與前面的反斜線組成偶數個反斜線而不再被解碼
+_BACKSLASH_WIDE_PATTERN = re.compile(r"\\[^\x00-\xff]")
+
+
+def _surrogate_pair(code_point: int) -> str:
+    """將 BMP 以外的字碼轉為 UTF-16 代理對的轉義序列"""
+    offset = code_point - 0x10000
+    high = 0xD800 + (offset >> 10)
+    low = 0xDC00 + (offset & 0x3FF)
+    return f"\\u{high:04x}\\u{low:04x}"
+
+
+class _EscapeTable(dict):
+    """`str.translate` 使用的轉換表，非 ASCII 字元首次出現時才計算並快取"""
+
+    def __missing__(self, code_point: int) -> str:
+        if code_point < 128:
+            raise KeyError(code_point)
+        if code_point > 0xFFFF:
+            escaped = _surrogate_pair(code_point)
+        else:
+            escaped = f"\\u{code_point:04x}"
+        self[code_point] = escaped
+        return escaped
+
+
+_ESCAPE_TABLE = _EscapeTable({code_point: code_point for code_point in range(128)})
+
+
+def _merge_surrogates(text: str) -> str:
+    """將字串中成對的 UTF-16 代理字元合併為單一字元"""
+    if not _SURROGATE_PATTERN.search(text):
+        return text
+    return text.encode("utf-16", "surrogatepass").decode("utf-16", "surrogatepass")
+
+
+def _decode_escapes(text: str) -> str:
+    """解碼 \\uXXXX 轉義序列，不處理代理對合併"""
+    if "\\u" not in text:
+        return text
+    # raw_unicode_escape 也會解碼 \UXXXXXXXX，遇到時改用正規表示式只處理 \uXXXX；
+    # 反斜線後接 U+00FF 以上的字元（例如 "C:\路徑"）會被 codec 破壞，同樣改用正規表示式
+    if "\\U" not in text and not _BACKSLASH_WIDE_PATTERN.search(text):
+        try:
+            return text.encode("raw_unicode_escape").decode("raw_unicode_escape")
+        except UnicodeDecodeError:
+            # 含有不完整的 \u 序列（例如 "\user"），改用正規表示式逐一處理
+            pass
+    return _UNICODE_ESCAPE_PATTERN.sub(
+        lambda m: m.group(1) + chr(int(m.group(2), 16)), text
+    )
 
 
 def unescape_unicode(text: str) -> str:
     """將 Unicode 轉義序列轉回 UTF-8 字元
 
+    以代理對表示的 BMP 以外字元（例如 `\\ud83d\\ude00`）會合併為單一字元。
+
     Args:
         text: 包含 Unicode 轉義序列的字串
 
     Returns:
         轉換後的 UTF-8 字串
     """
-    return re.sub(r"\\u([0-9a-fA-F]{4})", lambda m: chr(int(m.group(1), 16)), text)
+    return _merge_surrogates(_decode_escapes(text))
 
 
 def escape_non_ascii(text: str) -> str:
     """將非 ASCII 字元轉換為 Unicode 轉義序列
 
+    BMP 以外的字元會轉為 UTF-16 代理對（例如 😀 → `\\ud83d\\ude00`）。
+
     Args:
         text: 包含非 ASCII 字元的字串
 
     Returns:
         轉換後的字串，非 ASCII 字元會被轉換為 Unicode 轉義序列
     """
-    escaped_text = []
-    for char in text:
-        if ord(char) > 127:
-            escaped_text.append(f"\\u{ord(char):04x}")
+    if text.isascii():
+        return text
+    # 原文已含 \x 或 \U 時無法與 codec 產生的序列區分，改用轉換表處理
+    if "\\x" in text or "\\U" in text:
+        return text.translate(_ESCAPE_TABLE)
+    escaped = text.encode("ascii", "backslashreplace").decode("ascii")
+    if "\\x" in escaped:
+        escaped = _LATIN1_ESCAPE_PATTERN.sub(r"\\u00\1", escaped)
+    if "\\U" in escaped:
+        escaped = _ASTRAL_ESCAPE_PATTERN.sub(
+            lambda m: _surrogate_pair(int(m.group(1), 16)), escaped
+        )
+    return escaped
+
+
+def escape_stream(
+    source: TextIO, target: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> None:
+    """串流讀取文字並寫出轉義後的內容，記憶體用量與檔案大小無關
+
+    Args:
+        source: 以文字模式開啟的來源檔案物件
+        target: 以文字模式開啟的輸出檔案物件
+        chunk_size: 每次讀取的字元數
+    """
+    while chunk := source.read(chunk_size):
+        target.write(escape_non_ascii(chunk))
+
+
+def unescape_stream(
+    source: TextIO, target: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> None:
+    """串流讀取含轉義序列的文字並寫出解碼後的內容
+
+    區塊邊界可能切開轉義序列或代理對，因此尾端不完整的部分會保留到下一個區塊。
+
+    Args:
+        source: 以文字模式開啟的來源檔案物件
+        target: 以文字模式開啟的輸出檔案物件
+        chunk_size: 每次讀取的字元數
+    """
+    carry = ""
+    pending_high = ""
+    while chunk := source.read(chunk_size):
+        buffer = carry + chunk
+        # 最後 5 個字元內的反斜線可能是不完整的 \uXXXX，連同整段反斜線一起保留
+        cut = buffer.rfind("\\", max(len(buffer) - 5, 0))
+        if cut != -1:
+            while cut > 0 and buffer[cut - 1] == "\\":
+                cut -= 1
+            buffer, carry = buffer[:cut], buffer[cut:]
         else:
-            escaped_text.append(char)
-    return "".join(escaped_text)
+            carry = ""
+        decoded = pending_high + _decode_escapes(buffer)
+        pending_high = ""
+        # 區塊結尾的高代理字元需等下一個區塊的低代理字元才能合併
+        if decoded and "\ud800" <= decoded[-1] <= "\udbff":
+            decoded, pending_high = decoded[:-1], decoded[-1]
+        target.write(_merge_surrogates(decoded))
+    target.write(_merge_surrogates(pending_high + _decode_escapes(carry)))